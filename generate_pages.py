@@ -3,10 +3,113 @@
 Generate all Services and Lead Generation pages for IntelliCloud website
 """
 
+import argparse
+import collections
+import contextlib
+import csv
+import datetime
+import functools
+import gzip
+import hashlib
+import heapq
+import importlib.util
+import io
+import itertools
+import json
 import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from html import escape as escape_html
+from html.parser import HTMLParser
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urljoin, urlsplit
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from xml.sax.saxutils import escape
 
-# Base directory
-BASE_DIR = r"C:\Users\hugo\claude\intellicloud-website\src\pages\en"
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:  # optional: pip install Pillow
+    Image = None
+
+try:
+    import psycopg
+except ImportError:  # optional: pip install psycopg, for --sync-db postgresql://...
+    psycopg = None
+
+# Repository root and default output directory (one subdirectory per locale)
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.join(ROOT_DIR, "src", "pages")
+
+# Interface strings per locale; page content comes from the page configs,
+# which may carry per-locale overrides under a "locales" key. The site
+# navigation comes from NAV_TEMPLATE_PATH, with its labels in NAV_STRINGS.
+STRINGS = {
+    "en": {
+        "our_services": "Our Services",
+        "cta_heading": "Get Started Today",
+        "cta_text": "Let's discuss how we can help your business grow",
+        "contact_us": "Contact Us",
+        "home": "Home",
+        "breadcrumb": "Breadcrumb",
+        "copyright": "&copy; 2025 IntelliCloud. All rights reserved.",
+    },
+    "fr": {
+        "our_services": "Nos services",
+        "cta_heading": "Commencez dès aujourd'hui",
+        "cta_text": "Discutons de la façon dont nous pouvons aider votre entreprise à croître",
+        "contact_us": "Contactez-nous",
+        "home": "Accueil",
+        "breadcrumb": "Fil d'Ariane",
+        "copyright": "&copy; 2025 IntelliCloud. Tous droits réservés.",
+    },
+}
+
+DEFAULT_LOCALES = ["en"]
+
+# Public URL of the site, and where sitemap.xml, robots.txt and the search
+# index are written (Vite copies public/ to the root of dist/)
+SITE_URL = "https://intellicloud.com"
+SEO_DIR = os.path.join(ROOT_DIR, "public")
+
+# Sitemap protocol limit; larger sites get a sitemap index
+SITEMAP_MAX_URLS = 50000
+
+# Bump whenever the markup produced by generate_html changes so that
+# incremental builds re-render every page instead of trusting the manifest
+TEMPLATE_VERSION = "8"
+
+# Per-page content hashes from the last run, stored in the output root
+MANIFEST_NAME = ".generate-manifest.json"
+# Carried in the <head> of every page PAGE_TEMPLATE renders; an existing page
+# without it in its first GENERATOR_SCAN_BYTES is hand-written and kept
+GENERATOR_MARKER = b'<meta name="generator" content="generate_pages.py">'
+GENERATOR_SCAN_BYTES = 4096
+# Rollup input map of every page in the output root, read by vite.config.js
+VITE_INPUT_NAME = "vite-input.json"
+
+# Pages are rendered here first and moved into the output root once all succeed
+STAGING_NAME = ".generate-staging"
+
+# Content-addressed cache of compressed pages, in the output root
+CACHE_NAME = ".generate-cache"
+
+# Pages handed to the worker pools at once; bounds how much rendered HTML is in flight
+BATCH_SIZE = 256
+# Writer threads with --fsync; fsyncs mostly wait on the disk or the network
+# filesystem, so more of them can be in flight than there are CPUs
+FSYNC_WRITERS = 8
 
 # Define all pages to create with their content
 PAGES = {
@@ -277,61 +380,177 @@ LEAD_GEN_PAGES = {
 # Combine all pages
 ALL_PAGES = {**PAGES, **LEAD_GEN_PAGES}
 
-def generate_html(config):
-    """Generate HTML content for a page"""
-    color = config.get("color", "blue")
-
-    # Color mapping
-    color_map = {
-        "blue": {"from": "from-blue-600", "to": "to-blue-700", "text": "text-blue-600", "bg": "bg-blue-100", "border": "border-blue-200"},
-        "purple": {"from": "from-purple-600", "to": "to-purple-700", "text": "text-purple-600", "bg": "bg-purple-100", "border": "border-purple-200"},
-        "green": {"from": "from-green-600", "to": "to-green-700", "text": "text-green-600", "bg": "bg-green-100", "border": "border-green-200"},
-        "orange": {"from": "from-orange-600", "to": "to-orange-700", "text": "text-orange-600", "bg": "bg-orange-100", "border": "border-orange-200"},
-        "indigo": {"from": "from-indigo-600", "to": "to-indigo-700", "text": "text-indigo-600", "bg": "bg-indigo-100", "border": "border-indigo-200"},
-        "pink": {"from": "from-pink-600", "to": "to-pink-700", "text": "text-pink-600", "bg": "bg-pink-100", "border": "border-pink-200"},
-        "cyan": {"from": "from-cyan-600", "to": "to-cyan-700", "text": "text-cyan-600", "bg": "bg-cyan-100", "border": "border-cyan-200"},
+# Hierarchical site tree shared with scripts/import-site-structure.js
+SITE_STRUCTURE = os.path.join(ROOT_DIR, "data", "site-structure.json")
+
+# Top-level node standing for the hand-written homepage, src/pages/<locale>/index.html
+HOME_NODE = "home"
+
+# Palette cycled across the top-level sections of the site structure
+SECTION_COLORS = ["blue", "purple", "green", "orange", "indigo", "pink", "cyan"]
+
+def slugify(node_id):
+    """Generate slug from node ID (same rules as import-site-structure.js)"""
+    return re.sub(r"[^a-z0-9-]", "", re.sub(r"\s+", "-", node_id.lower()))
+
+def node_to_config(node, parent_slugs, color):
+    """Map a site-structure node to a (path, config) pair"""
+    children = node.get("children") or []
+    title = node.get("title") or "Untitled"
+    slugs = (*parent_slugs, slugify(node["id"]))
+
+    if children:
+        path = "/".join(slugs) + "/index.html"
+    else:
+        path = "/".join(slugs) + ".html"
+
+    return path, {
+        "title": f"{title} | IntelliCloud",
+        "h1": node.get("headline") or title,
+        "desc": node.get("description") or "",
+        "breadcrumb": title,
+        "color": color,
+        "services": [child.get("title") or "Untitled" for child in children],
+        "stats": [],
+        "cta": node.get("call_to_action") or "",
     }
 
-    colors = color_map.get(color, color_map["blue"])
+def iter_site_structure(json_path=SITE_STRUCTURE):
+    """Yield (path, config) pairs for every node of a site-structure JSON file
 
-    services_html = ""
-    for i, service in enumerate(config.get("services", [])):
-        services_html += f'''<li class="flex items-start"><svg class="w-5 h-5 {colors['text']} mr-2 mt-0.5" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7"></path></svg><span class="paragraph paragraph-small">{service}</span></li>'''
+    The site.nodes/children tree is walked depth-first with an explicit
+    stack and each config is built only when the consumer asks for it, so
+    rendering holds one page config at a time however large the tree is.
+    The HOME_NODE root is skipped: the homepage is written by hand.
+    """
+    with open(json_path, encoding="utf-8") as f:
+        nodes = json.load(f)["site"].get("nodes", [])
 
-    stats_html = ""
-    for stat in config.get("stats", []):
-        stats_html += f'''<div class="text-center"><div class="text-4xl font-bold {colors['text']} mb-2">{stat.split()[0]}</div><p class="text-gray-600">{' '.join(stat.split()[1:])}</p></div>'''
+    stack = [(node, (), SECTION_COLORS[i % len(SECTION_COLORS)]) for i, node in enumerate(nodes)]
+    stack.reverse()
 
-    return f'''<!DOCTYPE html>
-<html lang="en">
+    while stack:
+        node, parent_slugs, color = stack.pop()
+        if parent_slugs or slugify(node["id"]) != HOME_NODE:
+            yield node_to_config(node, parent_slugs, color)
+
+        slugs = (*parent_slugs, slugify(node["id"]))
+        for child in reversed(node.get("children") or []):
+            stack.append((child, slugs, color))
+
+# {name} and {name_column} placeholders that expand_matrix fills per variant
+VARIANT_FIELD = re.compile(r"\{(\w+)\}")
+
+def _row_values(name, row):
+    """Placeholder values for one dimension row, as (raw, JSON-escaped) pairs"""
+    slug = slugify(row.get("slug") or next(iter(row.values()), ""))
+    values = {name: slug, **{f"{name}_{column}": value for column, value in row.items()}}
+    return {key: (value, json.dumps(value, ensure_ascii=False)[1:-1]) for key, value in values.items()}
+
+def _fill(parts, values, escaped, where):
+    """Join VARIANT_FIELD.split() parts with each placeholder replaced from values"""
+    filled = parts[:]
+    for i in range(1, len(parts), 2):
+        try:
+            filled[i] = values[parts[i]][escaped]
+        except KeyError:
+            raise ConfigError(f"{where}: no dimension column for {{{parts[i]}}}") from None
+    return "".join(filled)
+
+def expand_matrix(path, config, dimensions):
+    """Yield a (path, config) pair for every combination of dimension rows
+
+    dimensions maps a name to its rows, each a dict of strings. A row's
+    slugified "slug" column (or first column) fills {name}, and each
+    column fills {name_column}, in path and in every string of config.
+    A variant path that would leave the locale directory is a ConfigError.
+    Path and config are split at their placeholders once; combinations are
+    produced one at a time, so memory holds the dimension tables but never
+    their cross product. Locales are not a dimension: build() renders every
+    variant for each of its locales.
+    """
+    tables = [[_row_values(name, row) for row in rows] for name, rows in dimensions.items()]
+    path_parts = VARIANT_FIELD.split(path)
+    config_parts = VARIANT_FIELD.split(json.dumps(config, ensure_ascii=False))
+
+    for combination in itertools.product(*tables):
+        values = {}
+        for row in combination:
+            values.update(row)
+        variant_path = _fill(path_parts, values, 0, path)
+        if os.path.isabs(variant_path) or os.path.normpath(variant_path).split(os.sep)[0] in (os.curdir, os.pardir):
+            raise ConfigError(f"{path}: variant path {variant_path!r} leaves the locale directory")
+        yield variant_path, json.loads(_fill(config_parts, values, 1, variant_path))
+
+def iter_matrix(spec_path):
+    """Yield the variant pages described by a matrix spec JSON file
+
+    The spec names a "path" with placeholders, a base config (the ALL_PAGES
+    entry named by "page", updated with "config") and "dimensions", each a
+    list of rows or a CSV file relative to the spec:
+
+        {"page": "lead-generation/local-listing/local-seo.html",
+         "path": "lead-generation/local-listing/local-seo/{city}.html",
+         "config": {"title": "Local SEO in {city_name} | IntelliCloud"},
+         "dimensions": {"city": "cities.csv"}}
+    """
+    with open(spec_path, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    dimensions = {}
+    for name, rows in spec["dimensions"].items():
+        if isinstance(rows, str):
+            with open(os.path.join(os.path.dirname(os.path.abspath(spec_path)), rows), encoding="utf-8", newline="") as f:
+                rows = list(csv.DictReader(f))
+        dimensions[name] = rows
+
+    config = {**ALL_PAGES.get(spec.get("page"), {}), **spec.get("config", {})}
+    return expand_matrix(spec["path"], config, dimensions)
+
+class PageTemplate:
+    """A page skeleton parsed once into static chunks and {{name}} slots"""
+
+    SLOT = re.compile(r"\{\{(\w+)\}\}")
+
+    def __init__(self, source):
+        self.parts = self.SLOT.split(source)
+        # Odd indexes of the split hold slot names, even ones static chunks
+        self.slots = [(i, self.parts[i]) for i in range(1, len(self.parts), 2)]
+
+    def partial(self, values):
+        """Return a new template with the given slots filled in ahead of time"""
+        parts = self.parts[:]
+        for i, name in self.slots:
+            parts[i] = values[name] if name in values else f"{{{{{name}}}}}"
+        return PageTemplate("".join(parts))
+
+    def render(self, values):
+        """Fill every slot from values and join the page in one pass"""
+        parts = self.parts[:]
+        for i, name in self.slots:
+            parts[i] = values[name]
+        return "".join(parts)
+
+PAGE_TEMPLATE = PageTemplate('''<!DOCTYPE html>
+<html lang="{{locale}}">
 <head>
   <meta charset="UTF-8">
   <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>{config["title"]}</title>
-  <meta name="description" content="{config["desc"]}">
-  <link rel="stylesheet" href="/src/styles/tailwind.css">
+  <meta name="generator" content="generate_pages.py">
+  <title>{{title}}</title>
+  <meta name="description" content="{{desc}}">
+  {{stylesheet}}
+  {{structured_data}}
 </head>
 <body class="bg-white">
-  <header class="bg-white border-b border-gray-200 sticky top-0 z-50">
-    <nav class="container mx-auto px-4 py-4">
-      <div class="flex items-center justify-between">
-        <a href="/src/pages/en/index.html" class="text-2xl font-bold">IntelliCloud</a>
-        <div class="hidden md:flex items-center space-x-8">
-          <a href="/src/pages/en/index.html" class="paragraph hover:text-blue-600">Home</a>
-          <a href="/src/pages/en/services/index.html" class="paragraph hover:text-blue-600">Services</a>
-          <a href="/src/pages/en/lead-generation/index.html" class="paragraph hover:text-blue-600">Lead Generation</a>
-          <a href="#contact" class="paragraph hover:text-blue-600">Contact</a>
-        </div>
-        <a href="#contact" class="btn btn-primary btn-sm hidden md:inline-flex">Get Started</a>
-      </div>
-    </nav>
-  </header>
+{{nav}}
 
-  <section class="bg-gradient-to-br {colors['from']} {colors['to']} text-white py-20">
+  <section class="bg-gradient-to-br {{from}} {{to}} text-white py-20">
     <div class="container mx-auto px-4">
       <div class="max-w-4xl mx-auto text-center">
-        <h1 class="text-4xl md:text-6xl font-bold mb-6">{config["h1"]}</h1>
-        <p class="text-xl text-white/90 mb-8">{config["desc"]}</p>
+        {{breadcrumbs}}
+        <h1 class="text-4xl md:text-6xl font-bold mb-6">{{h1}}</h1>
+        <p class="text-xl text-white/90 mb-8">{{desc}}</p>
       </div>
     </div>
   </section>
@@ -339,39 +558,2415 @@ def generate_html(config):
   <section class="py-16 bg-white">
     <div class="container mx-auto px-4">
       <div class="max-w-4xl mx-auto">
-        <h2 class="heading heading-2 mb-8 text-center">Our Services</h2>
-        <ul class="grid grid-cols-1 md:grid-cols-2 gap-4 mb-12">{services_html}</ul>
-        <div class="grid grid-cols-2 md:grid-cols-4 gap-8 max-w-4xl mx-auto">{stats_html}</div>
+        <h2 class="heading heading-2 mb-8 text-center">{{our_services}}</h2>
+        <ul class="grid grid-cols-1 md:grid-cols-2 gap-4 mb-12">{{services}}</ul>
+        <div class="grid grid-cols-2 md:grid-cols-4 gap-8 max-w-4xl mx-auto">{{stats}}</div>
       </div>
     </div>
   </section>
 
-  <section id="contact" class="py-16 bg-gradient-to-br {colors['from']} {colors['to']} text-white">
+  <section id="contact" class="py-16 bg-gradient-to-br {{from}} {{to}} text-white">
     <div class="container mx-auto px-4">
       <div class="max-w-4xl mx-auto text-center">
-        <h2 class="text-4xl font-bold mb-6">Get Started Today</h2>
-        <p class="text-xl text-white/90 mb-8">Let's discuss how we can help your business grow</p>
-        <a href="/src/pages/en/index.html#contact" class="btn btn-primary btn-lg bg-white {colors['text']} hover:bg-gray-100">Contact Us</a>
+        <h2 class="text-4xl font-bold mb-6">{{cta_heading}}</h2>
+        <p class="text-xl text-white/90 mb-8">{{cta_text}}</p>
+        <a href="/src/pages/{{locale}}/index.html#contact" class="btn btn-primary btn-lg bg-white {{text}} hover:bg-gray-100">{{cta}}</a>
       </div>
     </div>
   </section>
 
   <footer class="bg-gray-900 text-white py-12">
     <div class="container mx-auto px-4 text-center text-gray-400">
-      <p>&copy; 2025 IntelliCloud. All rights reserved.</p>
+      <p>{{copyright}}</p>
     </div>
   </footer>
 </body>
-</html>'''
+</html>''')
+
+# Tailwind classes per page color
+COLOR_MAP = {
+    "blue": {"from": "from-blue-600", "to": "to-blue-700", "text": "text-blue-600", "bg": "bg-blue-100", "border": "border-blue-200"},
+    "purple": {"from": "from-purple-600", "to": "to-purple-700", "text": "text-purple-600", "bg": "bg-purple-100", "border": "border-purple-200"},
+    "green": {"from": "from-green-600", "to": "to-green-700", "text": "text-green-600", "bg": "bg-green-100", "border": "border-green-200"},
+    "orange": {"from": "from-orange-600", "to": "to-orange-700", "text": "text-orange-600", "bg": "bg-orange-100", "border": "border-orange-200"},
+    "indigo": {"from": "from-indigo-600", "to": "to-indigo-700", "text": "text-indigo-600", "bg": "bg-indigo-100", "border": "border-indigo-200"},
+    "pink": {"from": "from-pink-600", "to": "to-pink-700", "text": "text-pink-600", "bg": "bg-pink-100", "border": "border-pink-200"},
+    "cyan": {"from": "from-cyan-600", "to": "to-cyan-700", "text": "text-cyan-600", "bg": "bg-cyan-100", "border": "border-cyan-200"},
+}
+
+def _build_palette(colors):
+    """Resolve the per-color markup around each service and stat once"""
+    return {
+        "from": colors["from"],
+        "to": colors["to"],
+        "text": colors["text"],
+        "service_open": f'''<li class="flex items-start"><svg class="w-5 h-5 {colors['text']} mr-2 mt-0.5" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7"></path></svg><span class="paragraph paragraph-small">''',
+        "service_close": '</span></li>',
+        "stat_open": f'''<div class="text-center"><div class="text-4xl font-bold {colors['text']} mb-2">''',
+        "stat_mid": '</div><p class="text-gray-600">',
+        "stat_close": '</p></div>',
+        # Closes a stat that has no label
+        "stat_bare_close": '</div></div>',
+    }
+
+PALETTES = {color: _build_palette(colors) for color, colors in COLOR_MAP.items()}
+
+class ConfigError(ValueError):
+    """A page config does not match PAGE_SCHEMA"""
+
+# Declared shape of a page config: field -> (expected type or allowed
+# values, required). [str] is a list of non-empty strings.
+PAGE_SCHEMA = {
+    "title": (str, True),
+    "h1": (str, True),
+    "desc": (str, True),
+    "breadcrumb": (str, False),
+    "color": (frozenset(COLOR_MAP), False),
+    "services": ([str], False),
+    "stats": ([str], False),
+    "cta": (str, False),
+    "locales": (dict, False),
+}
+
+def _compile_check(name, spec):
+    """Turn one PAGE_SCHEMA entry into a function returning an error message or None"""
+    if isinstance(spec, frozenset):
+        allowed = ", ".join(sorted(spec))
+        return lambda value: None if value in spec else f"{name} must be one of {allowed}, got {value!r}"
+    if isinstance(spec, list):
+        item_type = spec[0]
+        return lambda value: (
+            None if isinstance(value, list) and all(isinstance(item, item_type) and item.strip() for item in value)
+            else f"{name} must be a list of non-empty {item_type.__name__}s"
+        )
+    return lambda value: None if isinstance(value, spec) else f"{name} must be a {spec.__name__}, got {type(value).__name__}"
+
+def compile_schema(schema):
+    """Compile a schema into one validator returning the list of errors in a config"""
+    checks = [(name, required, _compile_check(name, spec)) for name, (spec, required) in schema.items()]
+    known = frozenset(schema)
+
+    def validate(config):
+        if not isinstance(config, dict):
+            return [f"config must be a dict, got {type(config).__name__}"]
+        errors = [] if known.issuperset(config) else [f"unknown field {name!r}" for name in sorted(config.keys() - known)]
+        for name, required, check in checks:
+            if name in config:
+                error = check(config[name])
+                if error:
+                    errors.append(error)
+            elif required:
+                errors.append(f"missing required field {name!r}")
+        return errors
+
+    return validate
+
+validate_config = compile_schema(PAGE_SCHEMA)
+
+# Page hashes whose config passed validate_config in this process
+_VALID_DIGESTS = set()
+
+# Site navigation shared by every page (see NAVIGATION_UPDATE_SUMMARY.md)
+NAV_TEMPLATE_PATH = os.path.join(ROOT_DIR, "update_nav_template.txt")
+
+# Markers in the nav template and the slots they become; every link into
+# src/pages/en/ is pointed at the page's own locale
+NAV_PLACEHOLDERS = [
+    ('href="/src/pages/en/', 'href="/src/pages/{{locale}}/'),
+    ('class="paragraph hover:text-blue-600 transition-colors">Home</a>', 'class="paragraph {{home_active}}">Home</a>'),
+    ('class="paragraph hover:text-blue-600 transition-colors flex items-center">\n              Technology', 'class="paragraph {{technology_active}} flex items-center">\n              Technology'),
+    ("SERVICES_ACTIVE", "{{services_active}}"),
+    ("LEADGEN_ACTIVE", "{{leadgen_active}}"),
+    ('href="LANG_EN_LINK" class="paragraph paragraph-small font-semibold text-blue-600"', 'href="{{lang_en_link}}" class="paragraph paragraph-small {{lang_en_class}}"'),
+    ('href="LANG_FR_LINK" class="paragraph paragraph-small hover:text-blue-600"', 'href="{{lang_fr_link}}" class="paragraph paragraph-small {{lang_fr_class}}"'),
+]
+
+# Nav labels per locale. Each English label is the text of one or more
+# elements in the nav template, which become a slot named after its key;
+# brand and product names are left as they are.
+NAV_STRINGS = {
+    "en": {
+        "nav_home": "Home",
+        "nav_technology": "Technology",
+        "nav_services": "Services",
+        "nav_lead_generation": "Lead Generation",
+        "nav_contact": "Contact",
+        "nav_get_started": "Get Started",
+        "nav_all_technologies": "All Technologies",
+        "nav_all_services": "All Services",
+        "nav_crm": "CRM Solutions",
+        "nav_ai": "AI Integration",
+        "nav_cloud_infrastructure": "Cloud Infrastructure",
+        "nav_api": "API Integration",
+        "nav_cloud_architecture": "Cloud Architecture",
+        "nav_website_creation": "Website Creation",
+        "nav_responsive_design": "Responsive Design",
+        "nav_saas": "SaaS Platforms",
+        "nav_custom_platforms": "Custom Platforms",
+        "nav_mobile": "Mobile Applications",
+        "nav_ios": "iOS Development",
+        "nav_android": "Android Development",
+        "nav_rest_apis": "REST APIs",
+        "nav_third_party": "Third-Party Integration",
+        "nav_ui_ux": "UI/UX Design",
+        "nav_design_systems": "Design Systems",
+        "nav_user_research": "User Research",
+        "nav_ppc": "PPC Campaigns",
+        "nav_on_page_seo": "On-Page SEO",
+        "nav_technical_seo": "Technical SEO",
+        "nav_content_strategy": "Content Strategy",
+        "nav_local_listing": "Local Listing",
+        "nav_google_business": "Google Business Profile",
+        "nav_local_seo": "Local SEO",
+    },
+    "fr": {
+        "nav_home": "Accueil",
+        "nav_technology": "Technologie",
+        "nav_services": "Services",
+        "nav_lead_generation": "Génération de leads",
+        "nav_contact": "Contact",
+        "nav_get_started": "Commencer",
+        "nav_all_technologies": "Toutes les technologies",
+        "nav_all_services": "Tous les services",
+        "nav_crm": "Solutions CRM",
+        "nav_ai": "Intégration de l'IA",
+        "nav_cloud_infrastructure": "Infrastructure cloud",
+        "nav_api": "Intégration d'API",
+        "nav_cloud_architecture": "Architecture cloud",
+        "nav_website_creation": "Création de sites web",
+        "nav_responsive_design": "Design adaptatif",
+        "nav_saas": "Plateformes SaaS",
+        "nav_custom_platforms": "Plateformes sur mesure",
+        "nav_mobile": "Applications mobiles",
+        "nav_ios": "Développement iOS",
+        "nav_android": "Développement Android",
+        "nav_rest_apis": "API REST",
+        "nav_third_party": "Intégrations tierces",
+        "nav_ui_ux": "Design UI/UX",
+        "nav_design_systems": "Systèmes de design",
+        "nav_user_research": "Recherche utilisateur",
+        "nav_ppc": "Campagnes PPC",
+        "nav_on_page_seo": "SEO on-page",
+        "nav_technical_seo": "SEO technique",
+        "nav_content_strategy": "Stratégie de contenu",
+        "nav_local_listing": "Référencement local",
+        "nav_google_business": "Profil d'entreprise Google",
+        "nav_local_seo": "SEO local",
+    },
+}
+
+class TemplateError(ValueError):
+    """The nav template lacks a marker that NAV_PLACEHOLDERS or NAV_STRINGS expects"""
+
+# Nav entry highlighted for each top-level section
+NAV_SECTIONS = {"index.html": "home_active", "technology": "technology_active", "services": "services_active", "lead-generation": "leadgen_active"}
+
+@functools.lru_cache(maxsize=None)
+def nav_template():
+    """Parse update_nav_template.txt once into a PageTemplate
+
+    Raises TemplateError when a NAV_PLACEHOLDERS marker or an English
+    NAV_STRINGS label is missing, rather than leaving it unlocalized.
+    """
+    with open(NAV_TEMPLATE_PATH, encoding="utf-8") as f:
+        source = f.read().rstrip()
+    for marker, slot in NAV_PLACEHOLDERS:
+        if marker not in source:
+            raise TemplateError(f"{NAV_TEMPLATE_PATH}: marker {marker!r} not found")
+        source = source.replace(marker, slot)
+    for slot, label in NAV_STRINGS["en"].items():
+        text = re.compile(rf">(\s*){re.escape(label)}(\s*)<")
+        source, found = text.subn(lambda match: f">{match.group(1)}{{{{{slot}}}}}{match.group(2)}<", source)
+        if not found:
+            raise TemplateError(f"{NAV_TEMPLATE_PATH}: nav label {label!r} not found")
+    return PageTemplate(source)
+
+@functools.lru_cache(maxsize=None)
+def nav_fragment(locale, section):
+    """The nav for one locale and section, with only the language links left open"""
+    values = {slot: "font-semibold text-blue-600" if key == section else "hover:text-blue-600 transition-colors" for key, slot in NAV_SECTIONS.items()}
+    values.update(NAV_STRINGS[locale])
+    values["locale"] = locale
+    values["lang_en_class"] = "font-semibold text-blue-600" if locale == "en" else "hover:text-blue-600"
+    values["lang_fr_class"] = "font-semibold text-blue-600" if locale == "fr" else "hover:text-blue-600"
+    return nav_template().partial(values)
+
+def page_section(path):
+    """The top-level nav section of a page path, relative to its locale directory"""
+    return path if path == "index.html" else path.split("/", 1)[0]
+
+def render_nav(locale, path, available_locales):
+    """Render the nav for the page at path (relative to its locale directory)
+
+    The language switcher links to the same page in another locale when it
+    is in available_locales, and to that locale's home page otherwise.
+    """
+    section = page_section(path)
+    links = {}
+    for target in ("en", "fr"):
+        page = path if path and target in available_locales else "index.html"
+        links[f"lang_{target}_link"] = f"/src/pages/{target}/{page}"
+    return nav_fragment(locale, section).render(links)
+
+@functools.lru_cache(maxsize=None)
+def template_fingerprint():
+    """TEMPLATE_VERSION combined with the nav template, so editing either rebuilds every page"""
+    return f"{TEMPLATE_VERSION}-{hashlib.sha256(''.join(nav_template().parts).encode('utf-8')).hexdigest()[:12]}"
+
+# Stylesheet every page links; with critical CSS it loads without blocking first paint
+STYLESHEET = "/src/styles/tailwind.css"
+STYLESHEET_LINK = f'<link rel="stylesheet" href="{STYLESHEET}">'
+
+# Inputs of the Tailwind build; critical CSS is rebuilt when any of them changes
+TAILWIND_INPUT = os.path.join(ROOT_DIR, "src", "styles", "tailwind.css")
+TAILWIND_CONFIG = os.path.join(ROOT_DIR, "tailwind.config.js")
+STYLE_SOURCES = os.path.join(ROOT_DIR, "src", "styles")
+
+def critical_skeleton(color):
+    """Every piece of markup a page of this palette can contain, with its slots left empty
+
+    The page skeleton, the nav as rendered in every locale and section,
+    the breadcrumbs and the palette's service and stat markup: exactly the
+    classes generate_html can emit for the palette, for Tailwind to scan.
+    """
+    palette = PALETTES[color]
+    navs = [nav_fragment(locale, section).parts[::2] for locale in STRINGS for section in NAV_SECTIONS]
+    return "\n".join([
+        *PAGE_TEMPLATE.parts[::2], *itertools.chain.from_iterable(navs),
+        BREADCRUMB_NAV, BREADCRUMB_LINK, BREADCRUMB_CURRENT,
+        *(value for value in palette.values()),
+    ])
+
+def _tailwind_sources():
+    """Bytes of the Tailwind input, the stylesheets it imports and the config, for cache keys"""
+    paths = [TAILWIND_CONFIG] + sorted(os.path.join(STYLE_SOURCES, name) for name in os.listdir(STYLE_SOURCES) if name.endswith(".css"))
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def compile_critical_css(color, cache_dir):
+    """The stylesheet Tailwind builds for a palette's skeleton: preflight, components and used utilities
+
+    Built with the same CLI, input and tailwind.config.js as the full
+    stylesheet, so first paint matches it and nothing shifts when it loads.
+    Cached under cache_dir by the skeleton and the Tailwind sources.
+    """
+    skeleton = critical_skeleton(color)
+    key = hashlib.sha256(f"{_tailwind_sources()}\0{skeleton}".encode("utf-8")).hexdigest()
+    cached = os.path.join(cache_dir, "critical", f"{key}.css")
+    if os.path.exists(cached):
+        with open(cached, encoding="utf-8") as f:
+            return f.read()
+
+    content = os.path.join(cache_dir, "critical", f"{key}.{os.getpid()}.html")
+    os.makedirs(os.path.dirname(content), exist_ok=True)
+    with open(content, 'w', encoding='utf-8') as f:
+        f.write(skeleton)
+    try:
+        css = subprocess.run([*TAILWIND_CLI, "-i", TAILWIND_INPUT, "--content", content, "--minify"], cwd=ROOT_DIR,
+                             capture_output=True, check=True).stdout
+    except OSError as exc:
+        raise AssetError(f"critical CSS needs the Tailwind CLI (npm install): {exc}") from exc
+    except subprocess.CalledProcessError as exc:
+        message = exc.stderr.decode("utf-8", "replace").strip() or f"exit status {exc.returncode}"
+        raise AssetError(f"critical CSS needs the Tailwind CLI (npm install): {message}") from exc
+    finally:
+        os.remove(content)
+    _write_cached(cached, css)
+    return css.decode("utf-8")
+
+def critical_stylesheets(cache_dir):
+    """((color, css), ...) for every palette, for OutputOptions.critical_css"""
+    return tuple((color, compile_critical_css(color, cache_dir)) for color in sorted(PALETTES))
+
+def critical_head(css):
+    """<head> markup inlining css and loading the full stylesheet without blocking first paint"""
+    # "</" would end the style element early
+    css = css.replace("</", "<\\/")
+    return (
+        f"<style>{css}</style>\n"
+        f'  <link rel="stylesheet" href="{STYLESHEET}" media="print" onload="this.media=\'all\'">\n'
+        f"  <noscript>{STYLESHEET_LINK}</noscript>"
+    )
+
+# Page skeleton with each locale's interface strings baked in
+LOCALE_TEMPLATES = {locale: PAGE_TEMPLATE.partial({"locale": locale, **strings}) for locale, strings in STRINGS.items()}
+
+def localize(config, locale):
+    """Return config with its overrides for locale applied"""
+    overrides = config.get("locales", {}).get(locale)
+    return {**config, **overrides} if overrides else config
+
+def split_stat(stat):
+    """Split a stat into its headline and label: "75+ GCP Projects" -> ("75+", "GCP Projects")
+
+    A single word such as "Award-Winning" is all headline, with no label.
+    """
+    value, _, label = stat.strip().partition(" ")
+    return value, label.strip()
+
+# Breadcrumb trail shown above each page's heading: Home / ancestors / page
+BREADCRUMB_NAV = '<nav aria-label="{label}" class="text-sm text-white/80 mb-6"><ol class="flex flex-wrap items-center justify-center gap-2">{items}</ol></nav>'
+BREADCRUMB_LINK = '<li><a href="{href}" class="hover:text-white transition-colors">{label}</a></li><li aria-hidden="true">/</li>'
+BREADCRUMB_CURRENT = '<li aria-current="page">{label}</li>'
+
+class PageIndex:
+    """Breadcrumb label of every page seen, keyed by path, for parent lookups
+
+    A page's parent is the nearest indexed dir/index.html or dir.html above
+    it, found with a dict lookup per level. Each ancestor's trail is
+    memoised, so building every trail stays linear in the number of pages.
+    """
+
+    def __init__(self, pages=()):
+        self.labels = {}
+        self._trails = {}
+        for path, config in pages:
+            self.add(path, config)
+
+    def add(self, path, config):
+        label = config.get("breadcrumb") or config.get("h1", "")
+        overrides = {locale: values["breadcrumb"] for locale, values in config.get("locales", {}).items() if "breadcrumb" in values}
+        self.labels[path] = (label, overrides)
+
+    def label(self, path, locale):
+        label, overrides = self.labels[path]
+        return overrides.get(locale, label)
+
+    def parent(self, path):
+        """Nearest indexed ancestor of path, or None when only the home page is above it"""
+        segments = path[:-len(".html")].split("/")
+        if segments[-1] == "index":
+            segments.pop()
+        while len(segments) > 1:
+            segments.pop()
+            directory = "/".join(segments)
+            for candidate in (f"{directory}/index.html", f"{directory}.html"):
+                if candidate in self.labels:
+                    return candidate
+        return None
+
+    def trail(self, path, locale):
+        """((label, path), ...) for each indexed ancestor of path, outermost first"""
+        parent = self.parent(path)
+        if parent is None:
+            return ()
+        key = (parent, locale)
+        if key not in self._trails:
+            self._trails[key] = (*self.trail(parent, locale), (self.label(parent, locale), parent))
+        return self._trails[key]
+
+def _crumbs(localized, locale, path, trail):
+    """(label, path) from the home page down to this one, or () for the home page itself"""
+    if not path or path == "index.html":
+        return ()
+    return ((STRINGS[locale]["home"], "index.html"), *trail, (localized.get("breadcrumb") or localized["h1"], path))
+
+def render_breadcrumbs(crumbs, locale):
+    """Breadcrumb <nav> linking every crumb but the last"""
+    if not crumbs:
+        return ""
+    *links, (current, _) = crumbs
+    items = "".join(BREADCRUMB_LINK.format(href=escape_html(f"/src/pages/{locale}/{path}"), label=escape_html(label)) for label, path in links)
+    return BREADCRUMB_NAV.format(label=STRINGS[locale]["breadcrumb"], items=items + BREADCRUMB_CURRENT.format(label=escape_html(current)))
+
+def structured_data(localized, locale, path, crumbs, site_url=SITE_URL):
+    """JSON-LD <script> describing the page as a Service, with its BreadcrumbList"""
+    base = f"{site_url.rstrip('/')}/src/pages/{locale}/"
+    service = {
+        "@type": "Service",
+        "name": localized["h1"],
+        "description": localized["desc"],
+        "url": base + path,
+        "provider": {"@type": "Organization", "name": "IntelliCloud", "url": site_url},
+    }
+    if localized.get("services"):
+        service["hasOfferCatalog"] = {
+            "@type": "OfferCatalog",
+            "name": STRINGS[locale]["our_services"],
+            "itemListElement": [{"@type": "Offer", "itemOffered": {"@type": "Service", "name": name}} for name in localized["services"]],
+        }
+    graph = [service]
+    if crumbs:
+        graph.append({"@type": "BreadcrumbList", "itemListElement": [
+            {"@type": "ListItem", "position": position, "name": label, "item": base + crumb}
+            for position, (label, crumb) in enumerate(crumbs, 1)
+        ]})
+    data = json.dumps({"@context": "https://schema.org", "@graph": graph}, ensure_ascii=False, separators=(",", ":"))
+    # "</" would end the script element early
+    data = data.replace("</", "<\\/")
+    return f'<script type="application/ld+json">{data}</script>'
+
+def render_fragments(config):
+    """Render the locale-independent parts of a page: palette classes, services and stats
+
+    Config strings are HTML-escaped here and in render_locales: they can come
+    from a CMS snapshot, a site structure or a matrix CSV, not just ALL_PAGES.
+    """
+    palette = PALETTES.get(config.get("color", "blue"), PALETTES["blue"])
+
+    service_open, service_close = palette["service_open"], palette["service_close"]
+    services = [f"{service_open}{escape_html(service)}{service_close}" for service in config.get("services", [])]
+
+    stat_open, stat_mid, stat_close = palette["stat_open"], palette["stat_mid"], palette["stat_close"]
+    stats = []
+    for stat in config.get("stats", []):
+        value, label = (escape_html(part) for part in split_stat(stat))
+        stats.append(f"{stat_open}{value}{stat_mid}{label}{stat_close}" if label else f"{stat_open}{value}{palette['stat_bare_close']}")
+
+    return {
+        "from": palette["from"],
+        "to": palette["to"],
+        "text": palette["text"],
+        "services": "".join(services),
+        "stats": "".join(stats),
+    }
+
+def render_locales(config, locales, path="", site_locales=None, trails=None, site_url=SITE_URL, critical_css=()):
+    """Render one page for each locale, sharing fragments between locales
+
+    Fragments are only re-rendered for a locale whose overrides change them.
+    path (relative to the locale directory) and site_locales, the locales
+    the page exists in, drive the nav's active section and language links.
+    trails maps each locale to the page's ancestors from PageIndex.trail,
+    rendered as breadcrumbs and, with site_url, as JSON-LD. With
+    critical_css, the (color, css) pairs from critical_stylesheets, the
+    page's palette's CSS is inlined in <head> and the full stylesheet is
+    loaded without blocking rendering.
+    """
+    if site_locales is None:
+        site_locales = locales
+    shared = render_fragments(config)
+    critical = dict(critical_css)
+    htmls = []
+    for locale in locales:
+        localized = localize(config, locale)
+        fragments = shared if localized is config else render_fragments(localized)
+        crumbs = _crumbs(localized, locale, path, trails.get(locale, ()) if trails else ())
+        htmls.append(LOCALE_TEMPLATES[locale].render({
+            **fragments,
+            "stylesheet": critical_head(critical[localized.get("color", "blue")]) if critical else STYLESHEET_LINK,
+            "nav": render_nav(locale, path, site_locales),
+            "breadcrumbs": render_breadcrumbs(crumbs, locale),
+            "structured_data": structured_data(localized, locale, path, crumbs, site_url),
+            "title": escape_html(localized["title"]),
+            "desc": escape_html(localized["desc"]),
+            "h1": escape_html(localized["h1"]),
+            "cta": escape_html(localized["cta"]) if localized.get("cta") else STRINGS[locale]["contact_us"],
+        }))
+    return htmls
+
+def _render_job(job):
+    """Process-pool entry point: render_locales plus the output stage
+
+    Returns the finished pages and (pid, [(phase, start, end), ...]) for the profiler.
+    """
+    *args, options = job
+    start = time.perf_counter()
+    htmls = render_locales(*args, site_url=options.site_url, critical_css=options.critical_css)
+    spans = [("render", start, time.perf_counter())]
+    return [finish_page(html, options, spans) for html in htmls], (os.getpid(), spans)
+
+def generate_html(config, locale="en", path="", trail=()):
+    """Generate HTML content for a page, below the (label, path) ancestors in trail"""
+    return render_locales(config, [locale], path, trails={locale: trail})[0]
+
+# Elements whose whitespace is significant and must be copied verbatim
+VERBATIM_ELEMENTS = re.compile(r"<(pre|textarea|script|style)\b.*?</\1\s*>", re.S | re.I)
+HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+LINE_BREAK_WS = re.compile(r"\s*\n\s*")
+
+def _collapse(text):
+    return LINE_BREAK_WS.sub(" ", HTML_COMMENT.sub("", text))
+
+def minify_html(html):
+    """Drop comments and collapse indentation, leaving verbatim elements untouched
+
+    Every whitespace run that spans a line break becomes a single space,
+    which HTML renders identically, so the minified page looks the same.
+    """
+    parts = []
+    pos = 0
+    for match in VERBATIM_ELEMENTS.finditer(html):
+        parts.append(_collapse(html[pos:match.start()]))
+        parts.append(match.group(0))
+        pos = match.end()
+    parts.append(_collapse(html[pos:]))
+    return "".join(parts).strip()
+
+COMPRESSORS = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+if brotli is not None:
+    COMPRESSORS[".br"] = lambda data: brotli.compress(data, quality=11)
+
+@dataclass(frozen=True)
+class OutputOptions:
+    """Post-processing applied to every rendered page before it is written"""
+    minify: bool = False
+    # Sibling extensions to precompress into, a subset of COMPRESSORS
+    compress: tuple = ()
+    cache_dir: str = None
+    # (color, css) pairs from critical_stylesheets, inlined per palette
+    critical_css: tuple = ()
+    # Published images from publish_images, substituted into <img> tags
+    images: tuple = ()
+    # (source, fingerprinted URL) pairs from publish_assets
+    assets: tuple = ()
+    # Public site URL for the absolute URLs in structured data
+    site_url: str = SITE_URL
+
+    @property
+    def variant(self):
+        """Part of the page hash, so changing options rewrites pages"""
+        published = [hashlib.sha256(repr(urls).encode()).hexdigest()[:12] for urls in (self.images, self.assets, self.critical_css) if urls]
+        site = [self.site_url] if self.site_url != SITE_URL else []
+        return ",".join(["min"] * self.minify + list(self.compress) + published + site)
+
+def compress_page(data, extensions, cache_dir=None):
+    """Return {extension: compressed bytes}, reusing cached results for identical content"""
+    siblings = {}
+    digest = hashlib.sha256(data).hexdigest() if cache_dir else None
+
+    for ext in extensions:
+        cached = os.path.join(cache_dir, digest[:2], digest + ext) if cache_dir else None
+        if cached and os.path.exists(cached):
+            with open(cached, 'rb') as f:
+                siblings[ext] = f.read()
+            continue
+
+        siblings[ext] = COMPRESSORS[ext](data)
+        if cached:
+            _write_cached(cached, siblings[ext])
+    return siblings
+
+# Text files under a built site worth precompressing, and the smallest one
+# that gains anything from it; served by Firebase via the matching Accept-Encoding
+COMPRESSIBLE = (".html", ".css", ".js", ".mjs", ".json", ".xml", ".svg", ".txt", ".map")
+MIN_COMPRESS_SIZE = 256
+
+def compress_tree(root, extensions):
+    """Write precompressed siblings next to every text file under root, e.g. dist/
+
+    Siblings newer than their file are kept. Returns (files, {extension: bytes}).
+    """
+    files, sizes = 0, {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            if not name.endswith(COMPRESSIBLE) or os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+            mtime = os.path.getmtime(path)
+            stale = [ext for ext in extensions
+                     if not os.path.exists(path + ext) or os.path.getmtime(path + ext) < mtime]
+            if not stale:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            for ext, blob in compress_page(data, stale).items():
+                _write_cached(path + ext, blob)
+                sizes[ext] = sizes.get(ext, 0) + len(blob)
+            files += 1
+    return files, sizes
+
+def _write_cached(path, data):
+    """Atomically write data to path, which concurrent workers may also be writing"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.{os.getpid()}", 'wb') as f:
+        f.write(data)
+    os.replace(f"{path}.{os.getpid()}", path)
+
+# Images referenced as /src/images/... are published under IMAGE_DIR with
+# content-hashed names, so firebase.json's year-long cache headers are safe
+IMAGE_SOURCE = "/src/images/"
+IMAGE_DIR = os.path.join(SEO_DIR, "images")
+IMAGE_URL = "/images/"
+# Widths to resize to; the nav logo renders 96-112px tall, so up to 3x
+IMAGE_WIDTHS = (128, 256, 384)
+# sizes attribute per source image, for browsers to pick from the srcset
+IMAGE_SIZES = {"/src/images/logo new gray.png": "(min-width: 1024px) 112px, 96px"}
+DEFAULT_IMAGE_SIZES = "100vw"
+# Modern formats offered through <picture>, best first, with encoder settings
+IMAGE_FORMATS = {"avif": ("image/avif", {"quality": 60}), "webp": ("image/webp", {"quality": 80})}
+IMG_TAG = re.compile(r"<img\b[^>]*>")
+IMG_SRC = re.compile(r'\bsrc="([^"]*)"')
+
+def image_formats():
+    """The IMAGE_FORMATS this Pillow build can encode"""
+    if Image is None:
+        return ()
+    Image.init()
+    return tuple(fmt for fmt in IMAGE_FORMATS if fmt.upper() in Image.SAVE)
+
+def referenced_images():
+    """Every /src/images/... source used by an <img> in the page or nav templates"""
+    markup = "".join(PAGE_TEMPLATE.parts[::2] + nav_template().parts[::2])
+    srcs = (IMG_SRC.search(tag) for tag in IMG_TAG.findall(markup))
+    return sorted({src.group(1) for src in srcs if src and src.group(1).startswith(IMAGE_SOURCE)})
+
+def _encode_image(source, digest, width, ext, fmt, params, cache_dir):
+    """Resize source to width and encode it as Pillow format fmt, cached by source hash, size and ext"""
+    cached = os.path.join(cache_dir, "images", digest[:2], f"{digest}-{width}.{ext}")
+    if os.path.exists(cached):
+        with open(cached, 'rb') as f:
+            return f.read()
+
+    buffer = io.BytesIO()
+    with Image.open(source) as image:
+        resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        resized.save(buffer, fmt, **params)
+    _write_cached(cached, buffer.getvalue())
+    return buffer.getvalue()
+
+def _publish_file(data, name, directory, url_prefix):
+    """Write data to directory under a content-hashed name and return its URL"""
+    stem, ext = os.path.splitext(name)
+    filename = f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+    path = os.path.join(directory, filename)
+    if not os.path.exists(path):
+        _write_cached(path, data)
+    return url_prefix + filename
+
+def publish_images(srcs, image_dir=IMAGE_DIR, cache_dir=None):
+    """Publish resized, content-hashed variants of each source image
+
+    Returns ((src, (fallback url, fallback srcset, ((mime type, srcset), ...))), ...)
+    for rewrite_images. Without Pillow, each image is only copied under a
+    content-hashed name with no resized variants, as are sources Pillow cannot
+    both read and write, such as SVG.
+    """
+    formats = image_formats()
+    extensions = Image.registered_extensions() if Image else {}
+    images = []
+    for src in srcs:
+        source = os.path.join(ROOT_DIR, src.lstrip("/"))
+        with open(source, 'rb') as f:
+            original = f.read()
+        stem, ext = os.path.splitext(os.path.basename(source))
+        stem = slugify(stem)
+        fallback_format = extensions.get(ext.lower())
+        if Image is None or fallback_format not in Image.OPEN or fallback_format not in Image.SAVE:
+            images.append((src, (_publish_file(original, stem + ext, image_dir, IMAGE_URL), "", ())))
+            continue
+
+        digest = hashlib.sha256(original).hexdigest()
+        with Image.open(source) as image:
+            widths = [width for width in IMAGE_WIDTHS if width < image.width] or [image.width]
+
+        def variants(ext, fmt, params):
+            return [
+                (_publish_file(_encode_image(source, digest, width, ext, fmt, params, cache_dir), f"{stem}-{width}w.{ext}", image_dir, IMAGE_URL), width)
+                for width in widths
+            ]
+
+        def srcset(urls):
+            return ", ".join(f"{url} {width}w" for url, width in urls)
+
+        sources = tuple((IMAGE_FORMATS[fmt][0], srcset(variants(fmt, fmt.upper(), IMAGE_FORMATS[fmt][1]))) for fmt in formats)
+        fallback = variants(ext.lstrip(".").lower(), fallback_format, {"optimize": True} if fallback_format == "PNG" else {})
+        images.append((src, (fallback[-1][0], srcset(fallback), sources)))
+    return tuple(images)
+
+def rewrite_images(html, images):
+    """Point <img> tags at published images, wrapping those with modern formats in <picture>"""
+    images = dict(images)
+
+    def replace(match):
+        tag = match.group(0)
+        src = IMG_SRC.search(tag)
+        if src is None or src.group(1) not in images:
+            return tag
+
+        url, srcset, sources = images[src.group(1)]
+        sizes = IMAGE_SIZES.get(src.group(1), DEFAULT_IMAGE_SIZES)
+        attrs = f'src="{url}"' + (f' srcset="{srcset}" sizes="{sizes}"' if srcset else "")
+        tag = tag.replace(src.group(0), attrs, 1)
+        if not sources:
+            return tag
+        picture = "".join(f'<source type="{mime}" srcset="{variants}" sizes="{sizes}">' for mime, variants in sources)
+        return f"<picture>{picture}{tag}</picture>"
+
+    return IMG_TAG.sub(replace, html)
+
+# Stylesheets linked from /src/styles/ are published under ASSET_DIR with
+# content-hashed names and listed in ASSET_MANIFEST_NAME, so firebase.json can
+# cache them as immutable while pages stay short-lived. Scripts are ES modules
+# with relative imports and are left for Vite to bundle and hash.
+ASSET_SOURCES = ("/src/styles/",)
+ASSET_DIR = os.path.join(SEO_DIR, "static")
+ASSET_URL = "/static/"
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+LINK_HREF = re.compile(r'<link\b[^>]*?\bhref="([^"]*)"')
+CSS_URL = re.compile(r'''url\(\s*(['"]?)(/src/[^'")]+?)\1\s*\)''')
+# At-rules only the Tailwind CLI resolves: imports are inlined, utilities generated
+CSS_BUILD_RULE = re.compile(rb"@(?:import|tailwind|apply)\b")
+TAILWIND_CLI = (os.path.join(ROOT_DIR, "node_modules", ".bin", "tailwindcss"),)
+
+class AssetError(ValueError):
+    """A referenced asset could not be built for fingerprinting"""
+
+class OverwriteError(ValueError):
+    """A page would replace an existing page the generator did not write"""
+
+def is_generated(full_path):
+    """True if the page at full_path carries GENERATOR_MARKER, i.e. a previous run wrote it"""
+    try:
+        with open(full_path, 'rb') as f:
+            return GENERATOR_MARKER in f.read(GENERATOR_SCAN_BYTES)
+    except OSError:
+        return False
+
+def referenced_assets():
+    """Every stylesheet under ASSET_SOURCES linked from the page or nav templates"""
+    markup = "".join(PAGE_TEMPLATE.parts[::2] + nav_template().parts[::2]) + STYLESHEET_LINK
+    return sorted({href for href in LINK_HREF.findall(markup) if href.startswith(ASSET_SOURCES)})
+
+def compile_stylesheet(source):
+    """Return the servable CSS for source, built with the Tailwind CLI when it needs it"""
+    with open(source, 'rb') as f:
+        data = f.read()
+    if not CSS_BUILD_RULE.search(data):
+        return data
+    try:
+        return subprocess.run([*TAILWIND_CLI, "-i", source, "--minify"], cwd=ROOT_DIR,
+                              capture_output=True, check=True).stdout
+    except OSError as exc:
+        raise AssetError(f"{os.path.relpath(source, ROOT_DIR)} needs the Tailwind CLI (npm install): {exc}") from exc
+    except subprocess.CalledProcessError as exc:
+        message = exc.stderr.decode("utf-8", "replace").strip() or f"exit status {exc.returncode}"
+        raise AssetError(f"{os.path.relpath(source, ROOT_DIR)} needs the Tailwind CLI (npm install): {message}") from exc
+
+def publish_assets(srcs, asset_dir=ASSET_DIR):
+    """Publish each stylesheet, and the files its url()s point at, under content-hashed names
+
+    Returns ((src, url), ...) for rewrite_assets. Referenced files are
+    published first, so a changed font or image also changes the hash of
+    every stylesheet using it. asset_dir/ASSET_MANIFEST_NAME maps each
+    source to its current URL and is only rewritten when one changes.
+    """
+    published = {}
+
+    def publish_url(match):
+        src = match.group(2)
+        if src not in published:
+            source = os.path.join(ROOT_DIR, unquote(src).lstrip("/"))
+            stem, ext = os.path.splitext(os.path.basename(source))
+            with open(source, 'rb') as f:
+                published[src] = _publish_file(f.read(), slugify(stem) + ext, asset_dir, ASSET_URL)
+        return f"url({match.group(1)}{published[src]}{match.group(1)})"
+
+    for src in srcs:
+        css = compile_stylesheet(os.path.join(ROOT_DIR, src.lstrip("/"))).decode("utf-8")
+        css = CSS_URL.sub(publish_url, css)
+        published[src] = _publish_file(css.encode("utf-8"), os.path.basename(src), asset_dir, ASSET_URL)
+
+    _write_json(os.path.join(asset_dir, ASSET_MANIFEST_NAME), dict(sorted(published.items())))
+    return tuple(sorted(published.items()))
+
+def rewrite_assets(html, assets):
+    """Point href and src attributes at the fingerprinted URLs of published assets"""
+    for src, url in assets:
+        html = html.replace(f'href="{src}"', f'href="{url}"').replace(f'src="{src}"', f'src="{url}"')
+    return html
+
+def finish_page(html, options, spans=None):
+    """Run the output stage on a rendered page
+
+    Returns (rendered size, bytes to write, {extension: compressed bytes}).
+    The minify and compress phases are appended to spans when it is given.
+    """
+    start = time.perf_counter()
+    raw = html.encode("utf-8")
+    if options.images:
+        html = rewrite_images(html, options.images)
+    if options.assets:
+        html = rewrite_assets(html, options.assets)
+    data = minify_html(html).encode("utf-8") if options.minify else html.encode("utf-8")
+    minified = time.perf_counter()
+    siblings = compress_page(data, options.compress, options.cache_dir)
+    if spans is not None:
+        spans += [("minify", start, minified), ("compress", minified, time.perf_counter())]
+    return len(raw), data, siblings
+
+def page_hash(config, locale="en", site_locales=DEFAULT_LOCALES, variant="", trail=()):
+    """Hash a page config together with the templates, locales, output options and breadcrumb trail"""
+    payload = json.dumps([localize(config, locale), trail], sort_keys=True, ensure_ascii=False)
+    key = f"{template_fingerprint()}\0{locale}\0{','.join(sorted(site_locales))}\0{variant}\0{payload}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def load_manifest(base_dir):
+    """Load the page hashes and lastmod dates recorded by the previous run
+
+    Returns a (pages, lastmod) tuple. Page hashes are dropped when the
+    templates changed; lastmod dates are kept.
+    """
+    try:
+        with open(os.path.join(base_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}, {}
+
+    lastmod = data.get("lastmod", {})
+    if data.get("template_version") != template_fingerprint():
+        return {}, lastmod
+    return data.get("pages", {}), lastmod
+
+def save_manifest(base_dir, pages, lastmod):
+    """Record the page hashes of this run for the next incremental build"""
+    os.makedirs(base_dir, exist_ok=True)
+    path = os.path.join(base_dir, MANIFEST_NAME)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump({"template_version": template_fingerprint(), "pages": pages, "lastmod": lastmod}, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def _fsync_dirs(directories):
+    """Flush each directory's entries, so renames into it survive a crash
+
+    Where directories cannot be opened (Windows) or fsynced, falls back to
+    a single os.sync() of everything, if the OS has one.
+    """
+    for directory in directories:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            break
+        try:
+            os.fsync(fd)
+        except OSError:
+            break
+        finally:
+            os.close(fd)
+    else:
+        return
+    if hasattr(os, "sync"):
+        os.sync()
+
+def _commit_staging(staging_dir, out_dir, paths, fsync):
+    """Move staged pages into out_dir, replacing each live page atomically
+
+    Readers of out_dir (vite, a deploy) only ever see a page's old or new
+    contents, never a partially written file. With fsync, each directory
+    a page lands in is flushed after the renames; the pages themselves were
+    flushed as they were written (see _write_page), so a crash leaves
+    either the old or the new page on disk as well.
+    """
+    _make_dirs(out_dir, paths)
+    for path in paths:
+        os.replace(os.path.join(staging_dir, path), os.path.join(out_dir, path))
+
+    if fsync:
+        _fsync_dirs({os.path.dirname(os.path.join(out_dir, path)) for path in paths})
+
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+def _make_dirs(root, paths):
+    """Create the parent directory of every path under root, once each"""
+    for directory in {os.path.dirname(path) for path in paths}:
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+def _write_page(full_path, data, siblings, fsync=False):
+    """Write one finished page and its precompressed siblings; the directory must exist"""
+    for path, blob in ((full_path, data), *((full_path + ext, blob) for ext, blob in siblings.items())):
+        with open(path, 'wb') as f:
+            f.write(blob)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+def _timed_write(full_path, data, siblings, fsync=False):
+    """_write_page, returning (thread id, start, end) for the profiler"""
+    start = time.perf_counter()
+    _write_page(full_path, data, siblings, fsync)
+    return threading.get_native_id(), start, time.perf_counter()
+
+@contextlib.contextmanager
+def _worker_pools(jobs, fsync=False):
+    """Yield (renderers, writers) pools, or (None, None) for a serial run
+
+    With fsync, a serial run still gets writer threads and every run gets
+    at least FSYNC_WRITERS of them, so the fsyncs overlap each other and
+    rendering instead of being paid one after another.
+    """
+    writers = max(jobs, FSYNC_WRITERS) if fsync else jobs
+    if jobs <= 1:
+        if writers <= 1:
+            yield None, None
+            return
+        with ThreadPoolExecutor(max_workers=writers) as pool:
+            yield None, pool
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as renderers, ThreadPoolExecutor(max_workers=writers) as pool:
+        yield renderers, pool
+
+def _format_size(size):
+    return f"{size / 1024:.1f} KB"
+
+def _page_report(raw_size, data, siblings):
+    """Size summary logged next to each page when the output stage is active"""
+    if len(data) == raw_size and not siblings:
+        return ""
+    sizes = [f"{_format_size(raw_size)} → {_format_size(len(data))}"]
+    sizes += [f"{ext} {_format_size(len(blob))}" for ext, blob in siblings.items()]
+    return f" ({', '.join(sizes)})"
+
+def _generate_batch(batch, out_dir, pools, jobs, verbose, site_locales, options, result, profiler=None, fsync=False):
+    """Render and write a batch of (path, config, locales, trails) jobs, logging in input order
+
+    Adds the files written and their sizes to result, and the render and
+    write timings to profiler when one is given. With fsync, each file is
+    fsynced by the writer thread that wrote it.
+    """
+    renderers, writers = pools
+    outputs = [[f"{locale}/{path}" for locale in locales] for path, _, locales, _ in batch]
+    _make_dirs(out_dir, [output for paths in outputs for output in paths])
+    jobs_args = [(config, locales, path, site_locales, trails, options) for path, config, locales, trails in batch]
+
+    if renderers is None:
+        rendered = map(_render_job, jobs_args)
+    else:
+        chunksize = max(1, len(batch) // (jobs * 4))
+        rendered = renderers.map(_render_job, jobs_args, chunksize=chunksize)
+
+    writes = None
+    if writers is not None:
+        queued, writes = [], []
+        # Each page's writes are queued as soon as its render comes back
+        for paths, (pages, timings) in zip(outputs, rendered):
+            queued.append((pages, timings))
+            writes.append([writers.submit(_timed_write, os.path.join(out_dir, output), data, siblings, fsync)
+                           for output, (_, data, siblings) in zip(paths, pages)])
+        rendered = queued
+
+    for i, (paths, (pages, timings)) in enumerate(zip(outputs, rendered)):
+        written = 0
+        for j, (output, (raw_size, data, siblings)) in enumerate(zip(paths, pages)):
+            if writes is None:
+                tid, start, end = _timed_write(os.path.join(out_dir, output), data, siblings, fsync)
+            else:
+                tid, start, end = writes[i][j].result()
+
+            result.written += 1
+            result.rendered_bytes += raw_size
+            result.output_bytes += len(data)
+            written += len(data)
+            for ext, blob in siblings.items():
+                result.compressed_bytes[ext] = result.compressed_bytes.get(ext, 0) + len(blob)
+                written += len(blob)
+            if profiler is not None:
+                profiler.record("write", start, end, tid=tid, page=output)
+            if verbose:
+                print(f"Created: {output}{_page_report(raw_size, data, siblings)}")
+
+        if profiler is not None:
+            profiler.page(batch[i][0], timings, written)
+
+class SiteIndexWriter:
+    """Streams sitemap.xml, robots.txt and search-index.json during a build
+
+    Entries are written as pages go by, from their configs, so the output
+    never has to be read back. The sitemap rolls over into numbered parts
+    referenced from a sitemap index once it passes max_urls. Files are
+    written under temporary names and moved into place by close().
+    """
+
+    def __init__(self, out_dir, site_url=SITE_URL, max_urls=SITEMAP_MAX_URLS):
+        self.out_dir = out_dir
+        self.site_url = site_url.rstrip("/")
+        self.max_urls = max_urls
+        self.urls = 0
+        self.parts = []
+        self.sitemap = None
+        os.makedirs(out_dir, exist_ok=True)
+        self.search = open(self._tmp("search-index.json"), 'w', encoding='utf-8')
+        self.search.write("[")
+
+    def _tmp(self, name):
+        return os.path.join(self.out_dir, name + ".tmp")
+
+    def _next_part(self):
+        if self.sitemap is not None:
+            self.sitemap.write("</urlset>\n")
+            self.sitemap.close()
+        self.parts.append(f"sitemap-{len(self.parts) + 1}.xml")
+        self.sitemap = open(self._tmp(self.parts[-1]), 'w', encoding='utf-8')
+        self.sitemap.write('<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+
+    def add(self, output, lastmod, config):
+        """Record the page at output (locale/path) with its localized config"""
+        if self.urls % self.max_urls == 0:
+            self._next_part()
+
+        url = f"{self.site_url}/src/pages/{output}"
+        self.sitemap.write(f"  <url><loc>{escape(url)}</loc><lastmod>{lastmod}</lastmod></url>\n")
+
+        entry = {"u": f"/src/pages/{output}", "t": config["title"], "d": config["desc"], "s": config.get("services", [])}
+        self.search.write(("," if self.urls else "") + json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+        self.urls += 1
+
+    def close(self):
+        """Finish every file and move it into place"""
+        if self.sitemap is None:
+            self._next_part()
+        self.sitemap.write("</urlset>\n")
+        self.sitemap.close()
+        self.search.write("]")
+        self.search.close()
+
+        if len(self.parts) == 1:
+            os.replace(self._tmp(self.parts[0]), self._tmp("sitemap.xml"))
+            self.parts = []
+        else:
+            with open(self._tmp("sitemap.xml"), 'w', encoding='utf-8') as f:
+                f.write('<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+                for part in self.parts:
+                    f.write(f"  <sitemap><loc>{escape(self.site_url)}/{part}</loc></sitemap>\n")
+                f.write("</sitemapindex>\n")
+
+        with open(self._tmp("robots.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"User-agent: *\nAllow: /\n\nSitemap: {self.site_url}/sitemap.xml\n")
+
+        for name in ["sitemap.xml", "robots.txt", "search-index.json", *self.parts]:
+            os.replace(self._tmp(name), os.path.join(self.out_dir, name))
+
+        # Parts left over from a previous, larger sitemap
+        stale = len(self.parts) + 1
+        while os.path.exists(os.path.join(self.out_dir, f"sitemap-{stale}.xml")):
+            os.remove(os.path.join(self.out_dir, f"sitemap-{stale}.xml"))
+            stale += 1
+
+    def abort(self):
+        """Drop the partially written files"""
+        for f in (self.sitemap, self.search):
+            if f is not None:
+                f.close()
+        for name in ["search-index.json", *self.parts]:
+            with contextlib.suppress(OSError):
+                os.remove(self._tmp(name))
+
+class Profiler:
+    """Phase timings and per-page stats for one build, exportable as a Chrome trace
+
+    build() reports its own phases into it; custom stages report into the
+    same trace with span() or record(). Times are time.perf_counter()
+    values, which are comparable across the render worker processes.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []
+        # Total seconds per phase, in first-seen order
+        self.phases = {}
+        # (seconds rendering, bytes written, page path) per rendered page
+        self.pages = []
+
+    def record(self, name, start, end, cat="build", pid=None, tid=None, **args):
+        """Add a finished span to the trace and its phase total"""
+        self.phases[name] = self.phases.get(name, 0.0) + end - start
+        self.events.append({
+            "name": name, "cat": cat, "ph": "X",
+            "ts": round((start - self.origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+            "pid": pid or os.getpid(), "tid": tid or threading.get_native_id(), "args": args,
+        })
+
+    @contextlib.contextmanager
+    def span(self, name, cat="build", **args):
+        """Time the body of a with block as one span"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), cat, **args)
+
+    def timed(self, iterable, name, cat="build"):
+        """Yield from iterable, recording the time spent producing each item"""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(name, start, time.perf_counter(), cat)
+            yield item
+
+    def page(self, path, timings, size):
+        """Record a page's render-worker spans from _render_job and the bytes written for it"""
+        pid, spans = timings
+        for name, start, end in spans:
+            self.record(name, start, end, pid=pid, tid=pid, page=path)
+        self.pages.append((sum(end - start for _, start, end in spans), size, path))
+
+    def write_trace(self, path):
+        """Write the trace-event JSON that chrome://tracing and Perfetto load"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+    def report(self, top=10):
+        """Return the phase totals and the top slowest pages as printable lines"""
+        lines = ["Phase            Total"]
+        lines += [f"{name:<16} {seconds * 1000:>8.1f}ms" for name, seconds in self.phases.items()]
+        if self.pages:
+            lines += ["", f"Slowest {min(top, len(self.pages))} pages     Render      Size"]
+            for seconds, size, path in sorted(self.pages, reverse=True)[:top]:
+                lines.append(f"  {path:<48} {seconds * 1000:>8.2f}ms {_format_size(size):>10}")
+        return lines
+
+@dataclass
+class BuildResult:
+    """Summary of a build() run"""
+    written: int = 0
+    skipped: int = 0
+    urls: int = 0
+    # Source images published by the image stage
+    images: int = 0
+    # Stylesheets and the files they reference published by the asset stage
+    assets: int = 0
+    # (page, href) for each dangling link, when links are checked
+    broken_links: list = field(default_factory=list)
+    # Sizes of the pages written by this run
+    rendered_bytes: int = 0
+    output_bytes: int = 0
+    compressed_bytes: dict = field(default_factory=dict)
+
+    @property
+    def total(self):
+        return self.written + self.skipped
+
+def build(pages=None, out_dir=BASE_DIR, *, locales=DEFAULT_LOCALES, force=False, jobs=1, fsync=False,
+          seo_dir=None, site_url=SITE_URL, minify=False, compress=(), critical_css=False,
+          images=False, image_dir=IMAGE_DIR, assets=False, asset_dir=ASSET_DIR,
+          check_links=False, index=None, profiler=None, verbose=True):
+    """Generate pages into out_dir/<locale>/ and return a BuildResult
+
+    pages is a dict or any iterable of (path, config) pairs, consumed lazily;
+    it defaults to ALL_PAGES. Each page is rendered for every locale in
+    locales, sharing its locale-independent fragments. Pages whose config
+    and template are unchanged since the last run are skipped unless force
+    is set. With jobs > 1, pages are rendered on a process pool and written
+    on a thread pool; the output and log order are the same as a serial run.
+
+    Pages are written to a staging directory and only moved into out_dir
+    once every page has rendered, so a failed run leaves out_dir untouched.
+    With fsync set, each page is fsynced on a writer thread as soon as it
+    is written to staging, overlapping with rendering and other fsyncs,
+    and each directory pages land in is fsynced once after the renames.
+
+    With seo_dir set, sitemap.xml, robots.txt and search-index.json for
+    every page (rendered or skipped) are streamed there in the same pass.
+    Each URL's lastmod is the date its content hash last changed.
+
+    minify collapses whitespace in the written HTML, and compress lists
+    sibling extensions (".gz", ".br") to precompress each page into. Both
+    run in the render workers; compressed output is cached by content hash
+    under out_dir so identical pages are never compressed twice. Vite
+    rebuilds the pages and does not copy these siblings into dist/; use
+    compress_tree on dist/ to precompress what is actually deployed.
+
+    critical_css inlines, per palette, the CSS the Tailwind CLI builds for
+    the page skeleton (preflight, components and the utilities it uses) in
+    each page's <head> and stops the full stylesheet from blocking first
+    paint. It is cached under out_dir; a missing CLI raises AssetError.
+
+    images publishes the images the templates use to image_dir under
+    content-hashed names, as resized WebP/AVIF variants when Pillow is
+    installed, and points each <img> at them through srcset. Encoded
+    variants are cached under out_dir by source hash and width.
+
+    assets publishes the stylesheets the templates link to (built with the
+    Tailwind CLI where needed) to asset_dir under content-hashed names,
+    rewrites every page to link to them and updates the asset manifest
+    there; a changed stylesheet therefore rewrites every page. AssetError
+    is raised before anything is written if one cannot be built.
+
+    check_links validates every link in out_dir once the run is committed,
+    hand-written pages included, and lists dangling ones in broken_links.
+
+    After each run, out_dir/vite-input.json lists every page in out_dir,
+    hand-written ones included, as the Rollup input for vite.config.js,
+    with a fingerprint of the tree it uses to tell whether the list is stale.
+
+    Each page's breadcrumbs and JSON-LD link the ancestors found in a
+    PageIndex of every page path; a dict of pages is indexed up front, while
+    a streamed source is indexed as it is read and so must list parents
+    before their children (site structures, matrices and CMS snapshots do).
+    When pages is only part of the site, pass a PageIndex of the whole site
+    as index.
+
+    An existing page that no earlier run wrote (a hand-written one, told
+    apart by its missing GENERATOR_MARKER) is never replaced unless force
+    is set; OverwriteError is raised instead and nothing is written.
+
+    Every new or changed page config is checked against PAGE_SCHEMA before
+    it is rendered; the first invalid one raises ConfigError and, since
+    nothing is committed from staging, leaves out_dir untouched.
+
+    A Profiler passed as profiler collects the timing of every phase and
+    the render time and size of every page rendered.
+    """
+    if pages is None:
+        pages = ALL_PAGES
+
+    unknown = [ext for ext in compress if ext not in COMPRESSORS]
+    if unknown:
+        raise ValueError(f"unsupported compression: {', '.join(unknown)} (brotli needs the 'brotli' package)")
+    span = profiler.span if profiler is not None else lambda name: contextlib.nullcontext()
+    cache_dir = os.path.join(out_dir, CACHE_NAME)
+    published = ()
+    if images:
+        with span("images"):
+            published = publish_images(referenced_images(), image_dir, cache_dir)
+    fingerprinted = ()
+    if assets:
+        with span("assets"):
+            fingerprinted = publish_assets(referenced_assets(), asset_dir)
+    critical = ()
+    if critical_css:
+        with span("critical-css"):
+            critical = critical_stylesheets(cache_dir)
+    options = OutputOptions(minify, tuple(compress), cache_dir if compress else None, critical, published, fingerprinted, site_url)
+
+    with span("load"):
+        previous, lastmod = load_manifest(out_dir)
+    manifest = dict(previous)
+    today = datetime.date.today().isoformat()
+    site_index = SiteIndexWriter(seo_dir, site_url) if seo_dir else None
+    result = BuildResult(images=len(published), assets=len(fingerprinted))
+    batch = []
+    staged = []
+
+    # Leftovers from a crashed run were never committed, so drop them
+    staging_dir = os.path.join(out_dir, STAGING_NAME)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+    items = pages.items() if hasattr(pages, "items") else pages
+    # A streamed source is indexed as it is read, so its parents must come first
+    if index is None:
+        index = PageIndex(items if hasattr(pages, "items") else ())
+    if profiler is not None:
+        items = profiler.timed(items, "load")
+
+    try:
+        with _worker_pools(jobs, fsync) as pools:
+            for path, config in items:
+                index.add(path, config)
+                pending = []
+                trails = {}
+                for locale in locales:
+                    output = f"{locale}/{path}"
+                    trails[locale] = index.trail(path, locale)
+                    digest = page_hash(config, locale, locales, options.variant, trails[locale])
+                    # A digest from the manifest was validated before it was written
+                    if digest not in _VALID_DIGESTS and previous.get(output) != digest:
+                        errors = validate_config(localize(config, locale))
+                        if errors:
+                            raise ConfigError(f"{output}: {'; '.join(errors)}")
+                        _VALID_DIGESTS.add(digest)
+                    if previous.get(output) != digest or output not in lastmod:
+                        lastmod[output] = today
+                    manifest[output] = digest
+                    if site_index is not None:
+                        site_index.add(output, lastmod[output], localize(config, locale))
+
+                    exists = os.path.exists(os.path.join(out_dir, output))
+                    # Pages in the manifest were written by an earlier run; others must carry the marker
+                    if not force and exists and output not in previous and not is_generated(os.path.join(out_dir, output)):
+                        raise OverwriteError(f"{output}: would replace a page the generator did not write (use --force to replace it)")
+                    complete = exists and all(os.path.exists(os.path.join(out_dir, output + ext)) for ext in options.compress)
+                    if not force and previous.get(output) == digest and complete:
+                        result.skipped += 1
+                    else:
+                        pending.append(locale)
+                        staged.append(output)
+                        staged.extend(output + ext for ext in options.compress)
+
+                if not pending:
+                    continue
+
+                batch.append((path, config, pending, trails))
+                if len(batch) >= BATCH_SIZE:
+                    _generate_batch(batch, staging_dir, pools, jobs, verbose, locales, options, result, profiler, fsync)
+                    batch = []
+
+            _generate_batch(batch, staging_dir, pools, jobs, verbose, locales, options, result, profiler, fsync)
+    except BaseException:
+        if site_index is not None:
+            site_index.abort()
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    with span("commit"):
+        _commit_staging(staging_dir, out_dir, staged, fsync)
+        save_manifest(out_dir, manifest, lastmod)
+        all_pages = list_pages(out_dir)
+        write_vite_input(out_dir, all_pages)
+    if site_index is not None:
+        with span("seo"):
+            site_index.close()
+        result.urls = site_index.urls
+    if check_links:
+        with span("links"):
+            result.broken_links = find_broken_links(out_dir, (ROOT_DIR, seo_dir or SEO_DIR), jobs, all_pages)
+    return result
+
+def _replace_header(full_path, nav):
+    """Stream full_path into a copy with its <header> region replaced by nav
+
+    Everything outside the header is copied line by line untouched. The copy
+    replaces the original atomically, and only if the header changed.
+    Returns True when the file was rewritten.
+    """
+    tmp_path = full_path + ".renav"
+    old_header = []
+    in_header = found = False
+
+    with open(full_path, encoding="utf-8", newline="") as src, open(tmp_path, 'w', encoding="utf-8", newline="") as dst:
+        for line in src:
+            if not found and not in_header:
+                marker = "<!-- Header -->" if "<!-- Header -->" in line else "<header" if "<header" in line else None
+                if marker is None:
+                    dst.write(line)
+                    continue
+
+                prefix, line = line[:line.index(marker)], line[line.index(marker):]
+                if prefix.strip():
+                    dst.write(prefix.rstrip() + "\n")
+                dst.write(nav + "\n")
+                found = in_header = True
+
+            if in_header:
+                if "</header>" not in line:
+                    old_header.append(line)
+                    continue
+                end = line.index("</header>") + len("</header>")
+                old_header.append(line[:end])
+                in_header = False
+                if line[end:].strip():
+                    dst.write(line[end:])
+                continue
+
+            dst.write(line)
+
+    if not found or "".join(old_header).strip() == nav.strip():
+        os.remove(tmp_path)
+        return False
+
+    os.replace(tmp_path, full_path)
+    return True
+
+def renav(pages_dir=BASE_DIR, verbose=True):
+    """Rewrite only the header of every existing page under pages_dir/<locale>/
+
+    Page bodies are never re-rendered; each file is streamed through once
+    with the cached nav fragment spliced in. Returns the number of pages
+    rewritten.
+    """
+    rewritten = 0
+    for locale in sorted(STRINGS):
+        locale_dir = os.path.join(pages_dir, locale)
+        for dirpath, dirnames, filenames in os.walk(locale_dir):
+            dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+            for name in sorted(filenames):
+                if not name.endswith(".html"):
+                    continue
+
+                full_path = os.path.join(dirpath, name)
+                path = os.path.relpath(full_path, locale_dir).replace(os.sep, "/")
+                available = [other for other in STRINGS if os.path.exists(os.path.join(pages_dir, other, path))]
+
+                if _replace_header(full_path, render_nav(locale, path, available)):
+                    rewritten += 1
+                    if verbose:
+                        print(f"Updated nav: {locale}/{path}")
+    return rewritten
+
+def list_pages(pages_dir=BASE_DIR):
+    """Every .html page under pages_dir as a sorted relative path, skipping dot directories"""
+    pages = []
+    for dirpath, dirnames, filenames in os.walk(pages_dir):
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+        pages.extend(
+            os.path.relpath(os.path.join(dirpath, name), pages_dir).replace(os.sep, "/")
+            for name in sorted(filenames) if name.endswith(".html")
+        )
+    return pages
+
+def write_vite_input(pages_dir, pages):
+    """Write the Rollup input map for pages to pages_dir/VITE_INPUT_NAME
+
+    Entry names are page paths without ".html", so foo/index.html and
+    foo.html become foo/index and foo instead of colliding; paths are
+    relative to the project root. Alongside them it records a fingerprint
+    of the tree: the page-bearing entries of pages_dir itself and the
+    mtime of every directory below it. Adding, deleting or renaming a page
+    changes one of those, which is how vite.config.js spots a stale file
+    with a stat per directory instead of globbing the tree. The file is
+    left alone when unchanged. Returns True if it was written.
+    """
+    prefix = os.path.relpath(pages_dir, ROOT_DIR).replace(os.sep, "/")
+    entries = {page[:-len(".html")]: f"{prefix}/{page}" for page in pages}
+    return _write_json(os.path.join(pages_dir, VITE_INPUT_NAME), {"pages": entries, **tree_fingerprint(pages_dir)})
+
+def tree_fingerprint(pages_dir):
+    """{"root": [entries], "dirs": {directory: mtime_ns}} for vite.config.js's staleness check
+
+    pages_dir's own mtime is not usable, since the generator keeps writing
+    its manifest and this file there, so its directories and pages are
+    listed instead. mtimes are strings, as JSON numbers lose nanoseconds.
+    """
+    root = sorted(entry.name for entry in os.scandir(pages_dir)
+                  if not entry.name.startswith(".") and (entry.is_dir() or entry.name.endswith(".html")))
+    dirs = {}
+    for dirpath, dirnames, _ in os.walk(pages_dir):
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+        if dirpath != pages_dir:
+            dirs[os.path.relpath(dirpath, pages_dir).replace(os.sep, "/")] = str(os.stat(dirpath).st_mtime_ns)
+    return {"root": root, "dirs": dirs}
+
+def _write_json(path, data):
+    """Atomically write data as indented JSON to path unless it already holds it; True if written"""
+    content = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(path + ".tmp", path)
+    return True
+
+# URL prefix the pages under BASE_DIR (or any out_dir) are served from
+PAGES_URL = "/src/pages/"
+# Read pages in chunks this size when extracting links
+LINK_CHUNK_SIZE = 1 << 16
+
+class LinkExtractor(HTMLParser):
+    """Collect the href of every <a> fed to it, one chunk at a time"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hrefs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.hrefs.append(href)
+
+def page_links(full_path):
+    """Stream a page through the tokenizer and return its hrefs"""
+    extractor = LinkExtractor()
+    with open(full_path, encoding="utf-8") as f:
+        for chunk in iter(lambda: f.read(LINK_CHUNK_SIZE), ""):
+            extractor.feed(chunk)
+    extractor.close()
+    return extractor.hrefs
+
+@functools.lru_cache(maxsize=4096)
+def _link_target(page_url, href):
+    """The root-relative path href points to from page_url, or None for links not to check"""
+    parts = urlsplit(urljoin(page_url, href))
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    return path + "index.html" if path.endswith("/") else path
+
+def find_broken_links(pages_dir=BASE_DIR, static_dirs=(ROOT_DIR, SEO_DIR), jobs=1, pages=None):
+    """Return (page, href) for every link in pages_dir that points nowhere
+
+    Every page under pages_dir is indexed in a set, then each is tokenized
+    once and its links are looked up in the set, so the check is linear in
+    the size of the tree. Links into PAGES_URL must hit an indexed page;
+    other root-relative links must exist in one of static_dirs. External
+    links and fragment-only links are not checked. With jobs > 1, pages are
+    tokenized on a process pool. pages, from list_pages, saves another walk.
+    """
+    if pages is None:
+        pages = list_pages(pages_dir)
+    index = set(pages)
+
+    paths = [os.path.join(pages_dir, page) for page in pages]
+    with contextlib.ExitStack() as stack:
+        if jobs > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+            links = pool.map(page_links, paths, chunksize=64)
+        else:
+            links = map(page_links, paths)
+
+        broken = []
+        for page, hrefs in zip(pages, links):
+            broken.extend(_dangling(page, hrefs, index, static_dirs))
+    return broken
+
+def _dangling(page, hrefs, index, static_dirs):
+    """Yield (page, href) for each distinct href of page that does not resolve"""
+    for href in dict.fromkeys(hrefs):
+        # Root-relative links resolve the same from every page
+        target = _link_target(PAGES_URL if href.startswith("/") else PAGES_URL + page, href)
+        if target is None:
+            continue
+        if target.startswith(PAGES_URL):
+            found = target[len(PAGES_URL):] in index
+        else:
+            found = _static_exists(target, static_dirs)
+        if not found:
+            yield page, href
+
+@functools.lru_cache(maxsize=4096)
+def _static_exists(target, static_dirs):
+    return any(os.path.exists(os.path.join(root, target.lstrip("/"))) for root in static_dirs)
+
+# Rows per multi-row INSERT when syncing to the CMS tables
+SYNC_BATCH_SIZE = 500
+# created_by/updated_by of the rows the sync writes
+SYNC_AUTHOR = "generate_pages.py"
+
+# The CMS tables from supabase/migrations in SQLite types, columns in the
+# same order, so the sync can run against a local file instead of Supabase
+# and pg_dump --inserts snapshots replay into it
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ic_web_pages (
+    id TEXT PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    language TEXT NOT NULL CHECK (language IN ('en', 'fr')),
+    title TEXT NOT NULL,
+    description TEXT,
+    content TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'draft' CHECK (status IN ('draft', 'published', 'archived')),
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_by TEXT,
+    updated_by TEXT,
+    content_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS ic_web_seo_meta (
+    id TEXT PRIMARY KEY,
+    page_id TEXT REFERENCES ic_web_pages(id) ON DELETE CASCADE,
+    meta_title TEXT,
+    meta_description TEXT,
+    meta_keywords TEXT,
+    og_title TEXT,
+    og_description TEXT,
+    og_image TEXT,
+    og_type TEXT DEFAULT 'website',
+    twitter_card TEXT DEFAULT 'summary_large_image',
+    twitter_title TEXT,
+    twitter_description TEXT,
+    twitter_image TEXT,
+    canonical_url TEXT,
+    robots TEXT DEFAULT 'index, follow',
+    structured_data TEXT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_ic_web_seo_meta_page_id ON ic_web_seo_meta(page_id);
+CREATE TABLE IF NOT EXISTS ic_web_navigation (
+    id TEXT PRIMARY KEY,
+    menu_key TEXT NOT NULL,
+    language TEXT NOT NULL CHECK (language IN ('en', 'fr')),
+    label TEXT NOT NULL,
+    url TEXT NOT NULL,
+    parent_id TEXT REFERENCES ic_web_navigation(id) ON DELETE CASCADE,
+    order_position INTEGER NOT NULL DEFAULT 0,
+    icon TEXT,
+    is_external INTEGER DEFAULT 0,
+    is_active INTEGER DEFAULT 1,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Placeholders for a plain and a JSONB parameter in each database's SQL
+SQL_PLACEHOLDERS = {"sqlite": ("?", "?"), "postgresql": ("%s", "%s::jsonb")}
+
+@functools.lru_cache(maxsize=None)
+def connect_db(url):
+    """Open the CMS database at url once per process and return (connection, dialect)
+
+    url is sqlite:///path/to/file.db (the stand-in schema is created if
+    needed) or a postgresql:// connection string, which needs psycopg and
+    the tables from supabase/migrations. Later calls reuse the connection.
+    """
+    if url.startswith("sqlite:///"):
+        connection = sqlite3.connect(url[len("sqlite:///"):])
+        connection.executescript(SQLITE_SCHEMA)
+        return connection, "sqlite"
+    if url.startswith(("postgresql://", "postgres://")):
+        if psycopg is None:
+            raise ValueError("postgresql:// URLs need the 'psycopg' package")
+        return psycopg.connect(url), "postgresql"
+    raise ValueError(f"unsupported database URL: {url} (use sqlite:///path or postgresql://...)")
+
+def page_slug(locale, path):
+    """CMS slug for a page: its path without .html, prefixed with the locale
+
+    ic_web_pages.slug is unique across languages, so the locale has to be
+    part of it; index pages keep their /index so foo.html and
+    foo/index.html stay distinct.
+    """
+    return f"{locale}/{path[:-len('.html')] if path.endswith('.html') else path}"
+
+def page_rows(config, locale, path, site_url=SITE_URL):
+    """The ic_web_pages and ic_web_seo_meta rows for one localized page"""
+    localized = localize(config, locale)
+    content = {key: localized[key] for key in ("h1", "breadcrumb", "color", "services", "stats", "cta") if key in localized}
+    content["path"] = path
+    page = {
+        "slug": page_slug(locale, path),
+        "language": locale,
+        "title": localized["title"],
+        "description": localized["desc"],
+        "content": json.dumps(content, sort_keys=True, ensure_ascii=False),
+        "status": "published",
+    }
+    seo = {
+        "meta_title": localized["title"],
+        "meta_description": localized["desc"],
+        "og_title": localized["title"],
+        "og_description": localized["desc"],
+        "canonical_url": f"{site_url.rstrip('/')}{PAGES_URL}{locale}/{path}",
+    }
+    return page, seo
+
+def _row_hash(page, seo):
+    return hashlib.sha256(json.dumps([page, seo], sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def _synced_hashes(connection):
+    """{slug: content_hash} for every page row, read in chunks"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT slug, content_hash FROM ic_web_pages")
+    hashes = {}
+    while True:
+        rows = cursor.fetchmany(SYNC_BATCH_SIZE)
+        if not rows:
+            return hashes
+        hashes.update(rows)
+
+def _upsert_batch(cursor, dialect, batch):
+    """Upsert one batch of (page, seo, hash) rows with two multi-row statements"""
+    param, json_param = SQL_PLACEHOLDERS[dialect]
+    row = f"({', '.join([param] * 6 + [json_param] + [param] * 3)})"
+    values = []
+    for page, _, digest in batch:
+        values += [str(uuid.uuid5(uuid.NAMESPACE_URL, page["slug"])), page["slug"], page["language"], page["title"],
+                   page["description"], page["status"], page["content"], digest, SYNC_AUTHOR, SYNC_AUTHOR]
+    cursor.execute(
+        "INSERT INTO ic_web_pages (id, slug, language, title, description, status, content, content_hash, created_by, updated_by) "
+        f"VALUES {', '.join([row] * len(batch))} "
+        "ON CONFLICT (slug) DO UPDATE SET language = excluded.language, title = excluded.title, "
+        "description = excluded.description, status = excluded.status, content = excluded.content, "
+        "content_hash = excluded.content_hash, updated_by = excluded.updated_by, updated_at = CURRENT_TIMESTAMP "
+        "RETURNING id, slug",
+        values,
+    )
+    ids = {slug: page_id for page_id, slug in cursor.fetchall()}
+
+    # ic_web_seo_meta has no unique key to upsert on, so replace the rows
+    page_ids = [ids[page["slug"]] for page, _, _ in batch]
+    cursor.execute(f"DELETE FROM ic_web_seo_meta WHERE page_id IN ({', '.join([param] * len(page_ids))})", page_ids)
+    row = f"({', '.join([param] * 7)})"
+    values = []
+    for page, seo, _ in batch:
+        values += [str(uuid.uuid4()), ids[page["slug"]], seo["meta_title"], seo["meta_description"],
+                   seo["og_title"], seo["og_description"], seo["canonical_url"]]
+    cursor.execute(
+        "INSERT INTO ic_web_seo_meta (id, page_id, meta_title, meta_description, og_title, og_description, canonical_url) "
+        f"VALUES {', '.join([row] * len(batch))}",
+        values,
+    )
+
+@dataclass
+class SyncResult:
+    """Summary of a sync_pages() run"""
+    upserted: int = 0
+    unchanged: int = 0
+
+def sync_pages(db_url, pages=None, *, locales=DEFAULT_LOCALES, site_url=SITE_URL, batch_size=SYNC_BATCH_SIZE):
+    """Upsert the page and SEO rows of pages into the CMS tables at db_url
+
+    The content hash stored with each ic_web_pages row is compared with the
+    hash of the rows the page would produce, and only pages that differ are
+    sent, batch_size at a time as multi-row statements on one reused
+    connection. Everything is committed in one transaction at the end.
+    """
+    if pages is None:
+        pages = ALL_PAGES
+    connection, dialect = connect_db(db_url)
+    result = SyncResult()
+    try:
+        synced = _synced_hashes(connection)
+        cursor = connection.cursor()
+        batch = []
+        for path, config in (pages.items() if hasattr(pages, "items") else pages):
+            for locale in locales:
+                page, seo = page_rows(config, locale, path, site_url)
+                digest = _row_hash(page, seo)
+                if synced.get(page["slug"]) == digest:
+                    result.unchanged += 1
+                    continue
+                batch.append((page, seo, digest))
+                if len(batch) >= batch_size:
+                    _upsert_batch(cursor, dialect, batch)
+                    result.upserted += len(batch)
+                    batch = []
+        if batch:
+            _upsert_batch(cursor, dialect, batch)
+            result.upserted += len(batch)
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    return result
+
+# Tables a .sql snapshot is replayed into; INSERTs into other tables are skipped
+SNAPSHOT_TABLES = ("ic_web_pages", "ic_web_seo_meta", "ic_web_navigation")
+SNAPSHOT_INSERT = re.compile(r'INSERT\s+INTO\s+(?:"?public"?\.)?"?(\w+)"?', re.I)
+SNAPSHOT_COLUMN_COUNT = re.compile(r"has (\d+) columns but (\d+) values were supplied")
+
+def open_snapshot(source):
+    """Open a CMS snapshot and return (connection, dialect)
+
+    source is a database URL for connect_db, or a .sql dump of INSERT
+    statements (pg_dump --data-only --inserts) that is replayed statement
+    by statement into an in-memory copy of SQLITE_SCHEMA.
+    """
+    if not source.endswith(".sql"):
+        return connect_db(source)
+
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(SQLITE_SCHEMA)
+    statement = ""
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            if not statement and (not line.strip() or line.lstrip().startswith("--")):
+                continue
+            statement += line
+            if not sqlite3.complete_statement(statement):
+                continue
+            match = SNAPSHOT_INSERT.match(statement.lstrip())
+            if match and match.group(1) in SNAPSHOT_TABLES:
+                _replay_insert(connection, match.group(1), SNAPSHOT_INSERT.sub("", statement.lstrip(), count=1))
+            statement = ""
+    return connection, "sqlite"
+
+def _replay_insert(connection, table, values):
+    """Run one dumped INSERT, given everything after its table name
+
+    A dump taken before a later migration has fewer columns than
+    SQLITE_SCHEMA. Migrations only ever append columns, so positional
+    values are matched to the leading columns and the rest keep their
+    defaults.
+    """
+    try:
+        connection.execute(f"INSERT INTO {table}{values}")
+    except sqlite3.OperationalError as exc:
+        counts = SNAPSHOT_COLUMN_COUNT.search(str(exc))
+        if counts is None or int(counts.group(2)) > int(counts.group(1)):
+            raise
+        columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table})")][:int(counts.group(2))]
+        connection.execute(f"INSERT INTO {table} ({', '.join(columns)}){values}")
+
+def cms_config(title, description, content):
+    """Page config for an ic_web_pages row
+
+    Reads the content written by sync_pages as well as the headline,
+    excerpt and call_to_action written by scripts/import-site-structure.js.
+    """
+    config = {
+        "title": title,
+        "h1": content.get("h1") or content.get("headline") or title,
+        "desc": description or content.get("excerpt") or "",
+    }
+    for key in ("breadcrumb", "color", "services", "stats"):
+        if key in content:
+            config[key] = content[key]
+    cta = content.get("cta") or content.get("call_to_action")
+    if cta:
+        config["cta"] = cta
+    return config
+
+def _tree_key(stem):
+    """Sort key placing a section's index page before everything inside the section
+
+    "services/index" sorts as "services", a prefix of (so before) every
+    "services/..." slug, which is the parents-first order PageIndex needs.
+    """
+    if stem == "index":
+        return ""
+    return stem[:-len("/index")] if stem.endswith("/index") else stem
+
+def _cms_rows(connection, dialect, language, rank):
+    """Stream ((tree key, stem), rank, path, config) for one language's published pages, parents first"""
+    param = SQL_PLACEHOLDERS[dialect][0]
+    # The SQL twin of _tree_key; Python compares strings by code point,
+    # which is Postgres' "C" collation
+    tree_key = "CASE WHEN slug LIKE '%/index' THEN substr(slug, 1, length(slug) - 6) ELSE slug END"
+    collate = ' COLLATE "C"' if dialect == "postgresql" else ""
+    order = f"{tree_key}{collate}, slug{collate}"
+    # A named cursor is server-side in psycopg, so rows arrive in chunks
+    cursor = connection.cursor(name=f"cms_pages_{language}") if dialect == "postgresql" else connection.cursor()
+    cursor.execute(
+        f"SELECT slug, title, description, content FROM ic_web_pages "
+        f"WHERE status = 'published' AND language = {param} ORDER BY {order}",
+        (language,),
+    )
+    prefix = f"{language}/"
+    for slug, title, description, content in cursor:
+        stem = slug[len(prefix):] if slug.startswith(prefix) else slug
+        content = json.loads(content) if isinstance(content, str) else content or {}
+        yield (_tree_key(stem), stem), rank, content.get("path") or f"{stem}.html", cms_config(title, description, content)
+
+def iter_cms_pages(source, locales=DEFAULT_LOCALES):
+    """Yield (path, config) for every published page in a CMS snapshot
+
+    One cursor per locale streams rows with each section's index page
+    ahead of the pages inside it, as build()'s breadcrumbs need, and the
+    streams are merged, so the rows for the same page in each language arrive
+    together: the first locale's row becomes the config and the others its
+    "locales" overrides. Pages with no row in the first locale are skipped,
+    since build() renders every page in every locale. Only one page is held in memory at a time, and
+    build() then skips every page whose row is unchanged since the last run.
+    """
+    connection, dialect = open_snapshot(source)
+    streams = [_cms_rows(connection, dialect, locale, rank) for rank, locale in enumerate(locales)]
+    for _, rows in itertools.groupby(heapq.merge(*streams), key=lambda row: row[0]):
+        _, rank, path, config = next(rows)
+        if rank:
+            # No row in the base locale; its content would be rendered under every locale
+            continue
+        overrides = {locales[rank]: localized for _, rank, _, localized in rows}
+        if overrides:
+            config = {**config, "locales": overrides}
+        yield path, config
+
+# Site snapshots under version/<name>/ are hardlinks into one content-addressed
+# object store, so a file shared by several versions is stored once
+VERSION_DIR = os.path.join(ROOT_DIR, "version")
+STORE_NAME = ".store"
+# Store objects are shared by every version that has the file, so never writable
+STORE_MODE = 0o444
+# Left out of a snapshot of the project root, which is served from dist/version:
+# build output, caches, and the tooling and database migrations that are not site
+SNAPSHOT_EXCLUDE = {".git", "node_modules", "dist", "version", "__pycache__", ".pytest_cache", CACHE_NAME, STAGING_NAME,
+                    "tests", "scripts", "supabase"}
+# Snapshots are published under dist/version/, so no .env, .env.local, ... ever goes in
+SNAPSHOT_SECRET_PREFIX = ".env"
+
+@dataclass
+class SnapshotResult:
+    """Summary of a snapshot_version() run"""
+    files: int = 0
+    # Objects added to the store, and their size in bytes
+    new_objects: int = 0
+    new_bytes: int = 0
+
+def _file_digest(path):
+    """sha256 of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(LINK_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _store_object(source, objects, link):
+    """Add source to the objects directory under its sha256; return (digest, True if it was new)
+
+    The object is a private copy, hashed as it is written, so later edits
+    to source cannot change it. With link set, source itself (a file that
+    already lives in a snapshot) is hardlinked into the store instead.
+    Objects are made read-only: every version sharing one is a hardlink to
+    it, so an in-place edit would change them all and break its hash name.
+    """
+    if link:
+        digest = _file_digest(source)
+        obj = os.path.join(objects, digest[:2], digest)
+        if os.path.exists(obj):
+            return digest, False
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        _link_or_copy(source, obj)
+        os.chmod(obj, STORE_MODE)
+        return digest, True
+
+    os.makedirs(objects, exist_ok=True)
+    tmp = os.path.join(objects, f".{os.getpid()}.tmp")
+    digest = hashlib.sha256()
+    with open(source, 'rb') as src, open(tmp, 'wb') as dst:
+        for chunk in iter(lambda: src.read(LINK_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            dst.write(chunk)
+    digest = digest.hexdigest()
+    obj = os.path.join(objects, digest[:2], digest)
+    if os.path.exists(obj):
+        os.remove(tmp)
+        return digest, False
+    os.makedirs(os.path.dirname(obj), exist_ok=True)
+    os.chmod(tmp, STORE_MODE)
+    os.replace(tmp, obj)
+    return digest, True
+
+def _link_or_copy(source, target):
+    """Atomically replace target with a hardlink to source, or a copy (mode included) where links are unsupported"""
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copy(source, tmp)
+    os.replace(tmp, target)
+
+def _snapshot_excluded(relative):
+    """True if a path relative to the snapshot source must stay out of it"""
+    return any(part in SNAPSHOT_EXCLUDE or part.startswith(SNAPSHOT_SECRET_PREFIX) for part in relative.split("/"))
+
+def _git_files(source_dir):
+    """Files under source_dir tracked by git, relative to it, or None outside a work tree"""
+    try:
+        listed = subprocess.run(["git", "-C", source_dir, "ls-files", "-z"], check=True, capture_output=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return sorted(os.fsdecode(path) for path in listed.split(b"\0") if path)
+
+def _walk_files(source_dir, exclude):
+    """Every regular file under source_dir, relative to it, skipping exclude"""
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        dirnames[:] = sorted(dirname for dirname in dirnames if not exclude(dirname + "/"))
+        for filename in sorted(filenames):
+            relative = os.path.relpath(os.path.join(dirpath, filename), source_dir).replace(os.sep, "/")
+            if not exclude(relative):
+                yield relative
+
+def snapshot_version(name, source_dir=ROOT_DIR, version_dir=VERSION_DIR):
+    """Snapshot source_dir as version_dir/<name>, storing each distinct file once
+
+    Only the files git tracks are taken, so untracked and ignored files
+    (caches, local notes, .env.local) never end up in a published
+    snapshot; outside a git work tree every file is, less SNAPSHOT_EXCLUDE.
+    .env* files are left out either way. Every file is copied into
+    version_dir/.store/objects/ under its sha256 and the snapshot tree is
+    made of hardlinks to those read-only objects; files already in the
+    store from an earlier version cost nothing. Objects are never linked
+    to working-tree files, so editing the project afterwards leaves
+    snapshots alone. A snapshot can be taken of a directory under
+    version_dir (its own, say) to move an existing copy into the store;
+    all of its files are kept. version_dir/.store/<name>.json records the
+    path -> sha256 manifest.
+    """
+    store = os.path.join(version_dir, STORE_NAME)
+    target_dir = os.path.join(version_dir, name)
+    # Files already inside version_dir are snapshots themselves and safe to link
+    link = os.path.commonpath([os.path.abspath(source_dir), os.path.abspath(version_dir)]) == os.path.abspath(version_dir)
+    if link:
+        files = _walk_files(source_dir, lambda relative: False)
+    else:
+        tracked = _git_files(source_dir)
+        if tracked is None:
+            files = _walk_files(source_dir, _snapshot_excluded)
+        else:
+            files = (relative for relative in tracked if not _snapshot_excluded(relative))
+    objects = os.path.join(store, "objects")
+    result = SnapshotResult()
+    manifest = {}
+
+    for relative in files:
+        source = os.path.join(source_dir, relative)
+        if not os.path.isfile(source) or os.path.islink(source):
+            continue
+        digest, new = _store_object(source, objects, link)
+        obj = os.path.join(objects, digest[:2], digest)
+        if new:
+            result.new_objects += 1
+            result.new_bytes += os.path.getsize(obj)
+
+        target = os.path.join(target_dir, relative)
+        if not (os.path.exists(target) and os.path.samefile(obj, target)):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            _link_or_copy(obj, target)
+        manifest[relative] = digest
+        result.files += 1
+
+    _write_json(os.path.join(store, f"{name}.json"), manifest)
+    return result
+
+def load_pages(source=None):
+    """Load page configs fresh from disk
+
+    source is a site-structure JSON file; without it the page dicts are
+    re-read from this script, so edits made since startup are picked up.
+    Returns a (pages, template_version) tuple.
+    """
+    if source:
+        return dict(iter_site_structure(source)), TEMPLATE_VERSION
+
+    spec = importlib.util.spec_from_file_location("_generate_pages_reload", os.path.abspath(__file__))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ALL_PAGES, module.TEMPLATE_VERSION
+
+def _stat_key(path):
+    """Cheap change marker for a watched file"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+# Preview server defaults; Vite's dev server keeps 5173
+PREVIEW_HOST = "127.0.0.1"
+PREVIEW_PORT = 8000
+# Rendered pages kept by the preview server, least recently viewed evicted first
+PREVIEW_CACHE_SIZE = 256
+
+class PreviewSite:
+    """Pages rendered on request from their configs, kept in a bounded LRU cache
+
+    The page source is re-read when its file changes, and each cached page
+    is keyed by its page_hash, so a page whose config or breadcrumb trail
+    changed is rendered again on its next view. Only the page configs are
+    reloaded: templates stay as they were at startup, and a reloaded
+    TEMPLATE_VERSION that differs is reported once as needing a restart.
+    Pages inline their palette's critical CSS, built once at startup, so
+    they are styled without a full Tailwind build; without the Tailwind
+    CLI they link the unbuilt stylesheet instead.
+    """
+
+    def __init__(self, source=None, locales=DEFAULT_LOCALES, cache_size=PREVIEW_CACHE_SIZE):
+        self.source = source
+        self.locales = locales
+        self.cache_size = cache_size
+        self.cache = collections.OrderedDict()
+        self.watched = os.path.abspath(source or __file__)
+        self.lock = threading.Lock()
+        self.template_version = TEMPLATE_VERSION
+        try:
+            self.critical_css = critical_stylesheets(os.path.join(BASE_DIR, CACHE_NAME))
+        except AssetError as exc:
+            print(f"! {exc}; pages link the unbuilt stylesheet")
+            self.critical_css = ()
+        self.variant = OutputOptions(critical_css=self.critical_css).variant
+        self._load()
+
+    def _load(self):
+        self.stat = _stat_key(self.watched)
+        self.pages, template_version = load_pages(self.source)
+        self.index = PageIndex(self.pages.items())
+        if template_version != self.template_version and template_version != TEMPLATE_VERSION:
+            print("! TEMPLATE_VERSION changed; restart --serve to pick up template edits")
+        self.template_version = template_version
+
+    def _refresh(self):
+        """Reload the page source if its file changed, keeping the old pages if it does not load"""
+        current = _stat_key(self.watched)
+        if current is None or current == self.stat:
+            return
+        try:
+            self._load()
+        except Exception as exc:
+            # Files are often saved mid-edit; try again on the next request
+            print(f"✗ Could not load {os.path.relpath(self.watched)}: {exc}")
+
+    def page(self, url_path):
+        """Return (ETag, HTML bytes, cache hit) for a /src/pages/<locale>/... path, or None"""
+        if not url_path.startswith(PAGES_URL):
+            return None
+        locale, _, path = unquote(url_path[len(PAGES_URL):]).partition("/")
+        if not path or path.endswith("/"):
+            path += "index.html"
+
+        with self.lock:
+            self._refresh()
+            config = self.pages.get(path)
+            if config is None or locale not in self.locales:
+                return None
+            trail = self.index.trail(path, locale)
+            digest = page_hash(config, locale, self.locales, self.variant, trail)
+            cached = self.cache.get((locale, path))
+            if cached is not None and cached[0] == digest:
+                self.cache.move_to_end((locale, path))
+                return cached[1], cached[2], True
+
+            errors = validate_config(localize(config, locale))
+            if errors:
+                raise ConfigError(f"{locale}/{path}: {'; '.join(errors)}")
+            html = render_locales(config, [locale], path, self.locales, trails={locale: trail}, critical_css=self.critical_css)[0]
+            etag = f'"{digest[:20]}"'
+            self.cache[(locale, path)] = (digest, etag, html.encode("utf-8"))
+            self.cache.move_to_end((locale, path))
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return etag, self.cache[(locale, path)][2], False
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    """Serve configured pages from a PreviewSite and everything else from the project root"""
+
+    def __init__(self, *args, site, **kwargs):
+        self.site = site
+        super().__init__(*args, directory=ROOT_DIR, **kwargs)
+
+    def do_GET(self):
+        if not self._send_page(head=False):
+            super().do_GET()
+
+    def do_HEAD(self):
+        if not self._send_page(head=True):
+            super().do_HEAD()
+
+    def _send_page(self, head):
+        start = time.perf_counter()
+        try:
+            page = self.site.page(urlsplit(self.path).path)
+        except ConfigError as exc:
+            self.send_error(500, f"Invalid page config: {exc}")
+            return True
+        if page is None:
+            return False
+
+        etag, body, hit = page
+        timing = f'{"hit" if hit else "render"};dur={(time.perf_counter() - start) * 1000:.2f}'
+        if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Server-Timing", timing)
+            self.end_headers()
+            return True
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        # Always revalidate, so an edited config shows on the next reload
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Server-Timing", timing)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+        return True
+
+def serve(source=None, *, locales=DEFAULT_LOCALES, host=PREVIEW_HOST, port=PREVIEW_PORT, cache_size=PREVIEW_CACHE_SIZE):
+    """Preview pages rendered on demand until interrupted, without writing anything"""
+    site = PreviewSite(source, locales, cache_size)
+    with ThreadingHTTPServer((host, port), functools.partial(PreviewHandler, site=site)) as server:
+        first = f"{PAGES_URL}{locales[0]}/{next(iter(site.pages), 'index.html')}"
+        print(f"✓ Previewing {len(site.pages)} pages at http://{host}:{server.server_port}{first} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print()
+
+def _watch_hashes(pages, locales):
+    """Hash every page with its breadcrumb trails, so renaming a parent changes its children
+
+    Returns ({path: digest}, the PageIndex of pages).
+    """
+    index = PageIndex(pages.items())
+    hashes = {
+        path: page_hash(config, trail=[index.trail(path, locale) for locale in locales])
+        for path, config in pages.items()
+    }
+    return hashes, index
+
+def watch(source=None, out_dir=BASE_DIR, *, locales=DEFAULT_LOCALES, interval=0.25, jobs=1, fsync=False):
+    """Rebuild, then keep regenerating only the pages whose config changes
+
+    Polls the page source every interval seconds until interrupted. Each
+    change is re-parsed and diffed against the previous configs by hash,
+    and only changed pages are rendered, in this already-warm process.
+    """
+    watched = os.path.abspath(source or __file__)
+    pages, _ = load_pages(source)
+    result = build(pages, out_dir, locales=locales, jobs=jobs, fsync=fsync, verbose=False)
+    print(f"✓ Generated {result.total} pages ({result.written} rewritten, {result.skipped} unchanged)")
+
+    hashes, _ = _watch_hashes(pages, locales)
+    last = _stat_key(watched)
+    print(f"Watching {os.path.relpath(watched)} for changes (Ctrl+C to stop)")
+
+    try:
+        while True:
+            time.sleep(interval)
+            current = _stat_key(watched)
+            if current is None or current == last:
+                continue
+            last = current
+            start = time.perf_counter()
+
+            try:
+                pages, template_version = load_pages(source)
+            except Exception as exc:
+                # Files are often saved mid-edit; wait for the next save
+                print(f"✗ Could not load {os.path.relpath(watched)}: {exc}")
+                continue
+
+            if template_version != TEMPLATE_VERSION:
+                print("! TEMPLATE_VERSION changed; restart --watch to pick up template edits")
+
+            new_hashes, index = _watch_hashes(pages, locales)
+            changed = {path: pages[path] for path, digest in new_hashes.items() if hashes.get(path) != digest}
+            removed = hashes.keys() - new_hashes.keys()
+            hashes = new_hashes
+
+            if changed:
+                try:
+                    build(changed, out_dir, locales=locales, fsync=fsync, index=index)
+                except ConfigError as exc:
+                    print(f"✗ Invalid page config, nothing written: {exc}")
+                    continue
+                except OverwriteError as exc:
+                    print(f"✗ Refusing to replace a hand-written page, nothing written: {exc}")
+                    continue
+            for path in sorted(removed):
+                print(f"Removed from config (file left in place): {path}")
+
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"✓ {len(changed)} changed, {len(removed)} removed in {elapsed:.0f}ms")
+    except KeyboardInterrupt:
+        print()
+
+def _cli_pages(args, locales):
+    """The pages selected by --from-cms or --source, else ALL_PAGES, followed by any --matrix variants"""
+    if args.from_cms:
+        pages = iter_cms_pages(args.from_cms, locales)
+    else:
+        pages = iter_site_structure(args.source) if args.source else ALL_PAGES
+    if not args.matrix:
+        return pages
+    items = pages.items() if hasattr(pages, "items") else pages
+    return itertools.chain(items, *(iter_matrix(spec) for spec in args.matrix))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate IntelliCloud Services and Lead Generation pages")
+    parser.add_argument("--out", "-o", default=BASE_DIR, metavar="DIR", help="output root, one subdirectory per locale (default: src/pages)")
+    parser.add_argument("--locales", default=",".join(DEFAULT_LOCALES), help=f"comma-separated locales to generate (available: {', '.join(STRINGS)})")
+    parser.add_argument("--source", metavar="JSON", help="read pages from a site-structure JSON file (e.g. data/site-structure.json) instead of the built-in page dicts")
+    parser.add_argument("--from-cms", metavar="SNAPSHOT", help="render the published pages of a CMS snapshot: a .sql dump, sqlite:///file.db or postgresql://...")
+    parser.add_argument("--matrix", action="append", metavar="SPEC", help="also render the variant pages of a matrix spec JSON file, e.g. a service for every city (repeatable)")
+    parser.add_argument("--force", action="store_true", help="rewrite every page even if its content is unchanged")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N", help="render and write pages with N parallel workers")
+    parser.add_argument("--fsync", action="store_true", help="fsync each page before moving it into place, and its directory after")
+    parser.add_argument("--seo-dir", default=SEO_DIR, metavar="DIR", help="where to write sitemap.xml, robots.txt and search-index.json (default: public)")
+    parser.add_argument("--no-seo", action="store_true", help="skip the sitemap, robots.txt and search index")
+    parser.add_argument("--site-url", default=SITE_URL, help=f"public site URL used in the sitemap (default: {SITE_URL})")
+    parser.add_argument("--minify", action="store_true", help="collapse whitespace and drop comments in the written HTML")
+    parser.add_argument("--compress", action="store_true", help="also write precompressed .gz (and .br with the brotli package) siblings next to the pages (Vite does not copy them to dist; see --compress-dist)")
+    parser.add_argument("--compress-dist", nargs="?", const="dist", metavar="DIR", help="only precompress the built site after `vite build` (default: dist)")
+    parser.add_argument("--critical-css", action="store_true", help="inline the CSS Tailwind builds for each palette's page skeleton in <head> and load the full stylesheet asynchronously (needs the Tailwind CLI)")
+    parser.add_argument("--images", action="store_true", help="publish resized, content-hashed images and rewrite <img> tags to use them")
+    parser.add_argument("--image-dir", default=IMAGE_DIR, metavar="DIR", help="where --images writes (default: public/images)")
+    parser.add_argument("--fingerprint", action="store_true", help="publish the stylesheet under a content-hashed name with an asset manifest and link pages to it")
+    parser.add_argument("--asset-dir", default=ASSET_DIR, metavar="DIR", help="where --fingerprint writes (default: public/static)")
+    parser.add_argument("--check-links", action="store_true", help="fail if any page under --out links to a page or file that does not exist")
+    parser.add_argument("--profile", nargs="?", const="generate-trace.json", metavar="TRACE", help="print phase timings and the slowest pages, and write a Chrome trace (default: generate-trace.json)")
+    parser.add_argument("--top", type=int, default=10, metavar="N", help="slowest pages listed by --profile (default: 10)")
+    parser.add_argument("--sync-db", metavar="URL", help="also upsert changed page and SEO rows into the CMS tables (sqlite:///file.db or postgresql://...)")
+    parser.add_argument("--snapshot", metavar="NAME", help="only snapshot the project as version/NAME, storing files shared with other versions once")
+    parser.add_argument("--snapshot-from", default=ROOT_DIR, metavar="DIR", help="directory --snapshot copies (default: the project root; version/NAME itself moves it into the store)")
+    parser.add_argument("--renav", action="store_true", help=f"only rewrite the <header> of every existing page from {os.path.basename(NAV_TEMPLATE_PATH)}")
+    parser.add_argument("--watch", "-w", action="store_true", help="keep running and regenerate pages whose config changes")
+    parser.add_argument("--serve", action="store_true", help="serve pages rendered on demand from their configs instead of writing them")
+    parser.add_argument("--port", type=int, default=PREVIEW_PORT, help=f"--serve port (default: {PREVIEW_PORT})")
+    parser.add_argument("--interval", type=float, default=0.25, metavar="SECONDS", help="--watch polling interval (default: 0.25)")
+    parser.add_argument("--quiet", "-q", action="store_true", help="only print the summary line")
+    args = parser.parse_args(argv)
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.from_cms and (args.source or args.watch or args.serve):
+        parser.error("--from-cms cannot be combined with --source, --watch or --serve")
+
+    locales = [locale.strip() for locale in args.locales.split(",") if locale.strip()]
+    unknown = [locale for locale in locales if locale not in STRINGS]
+    if not locales or unknown:
+        parser.error(f"unknown locale(s): {', '.join(unknown) or '(none)'}")
+
+    if args.snapshot:
+        snapshot = snapshot_version(args.snapshot, args.snapshot_from)
+        print(f"✓ Snapshot {args.snapshot}: {snapshot.files} files, {snapshot.new_objects} new "
+              f"({_format_size(snapshot.new_bytes)}), {snapshot.files - snapshot.new_objects} already stored")
+        return 0
+
+    if args.compress_dist:
+        if not os.path.isdir(args.compress_dist):
+            parser.error(f"--compress-dist: {args.compress_dist} does not exist; run `npm run build` first")
+        files, sizes = compress_tree(args.compress_dist, tuple(COMPRESSORS))
+        if brotli is None:
+            print("! brotli package not installed; writing .gz siblings only")
+        print(f"✓ Precompressed {files} files in {args.compress_dist}"
+              + "".join(f", {ext} {_format_size(size)}" for ext, size in sizes.items()))
+        return 0
+
+    try:
+        nav_template()
+    except TemplateError as exc:
+        print(f"✗ Nav template is out of date, nothing written: {exc}")
+        return 1
+
+    if args.renav:
+        rewritten = renav(args.out, verbose=not args.quiet)
+        print(f"\n✓ Updated navigation in {rewritten} pages")
+        return 0
+
+    if args.serve:
+        serve(args.source, locales=locales, port=args.port)
+        return 0
+
+    if args.watch:
+        watch(args.source, args.out, locales=locales, interval=args.interval, jobs=args.jobs, fsync=args.fsync)
+        return 0
 
-# Generate all pages
-for path, config in ALL_PAGES.items():
-    full_path = os.path.join(BASE_DIR, path)
-    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    compress = ()
+    if args.compress:
+        compress = tuple(COMPRESSORS)
+        if brotli is None:
+            print("! brotli package not installed; writing .gz siblings only")
 
-    with open(full_path, 'w', encoding='utf-8') as f:
-        f.write(generate_html(config))
+    pages = _cli_pages(args, locales)
+    profiler = Profiler() if args.profile else None
+    try:
+        result = build(pages, args.out, locales=locales, force=args.force, jobs=args.jobs, fsync=args.fsync,
+                       seo_dir=None if args.no_seo else args.seo_dir, site_url=args.site_url,
+                       minify=args.minify, compress=compress, critical_css=args.critical_css,
+                       images=args.images, image_dir=args.image_dir, assets=args.fingerprint,
+                       asset_dir=args.asset_dir, check_links=args.check_links,
+                       profiler=profiler, verbose=not args.quiet)
+    except ConfigError as exc:
+        print(f"\n✗ Invalid page config, nothing written: {exc}")
+        return 1
+    except OverwriteError as exc:
+        print(f"\n✗ Refusing to replace a hand-written page, nothing written: {exc}")
+        return 1
+    except AssetError as exc:
+        print(f"\n✗ Could not build assets, nothing written: {exc}")
+        return 1
 
-    print(f"Created: {path}")
+    print(f"\n✓ Successfully generated {result.total} pages ({result.written} rewritten, {result.skipped} unchanged)")
+    if result.written and (args.minify or compress):
+        sizes = [f"{_format_size(result.rendered_bytes)} rendered → {_format_size(result.output_bytes)} written"]
+        sizes += [f"{ext} {_format_size(size)}" for ext, size in result.compressed_bytes.items()]
+        print(f"✓ {', '.join(sizes)}")
+    if result.images:
+        print(f"✓ Published {result.images} images to {args.image_dir}" + ("" if Image else " (install Pillow for resized WebP/AVIF variants)"))
+    if result.assets:
+        print(f"✓ Published {result.assets} fingerprinted assets to {args.asset_dir} ({ASSET_MANIFEST_NAME})")
+    if result.urls:
+        print(f"✓ Sitemap and search index cover {result.urls} URLs")
+    if profiler is not None:
+        profiler.write_trace(args.profile)
+        print()
+        print("\n".join(profiler.report(args.top)))
+        print(f"✓ Trace written to {args.profile}")
+    if result.broken_links:
+        print(f"\n✗ {len(result.broken_links)} dangling links:")
+        for page, href in result.broken_links:
+            print(f"  {page} → {href}")
+        return 1
+    if args.check_links:
+        print("✓ No dangling links")
+    if args.sync_db:
+        synced = sync_pages(args.sync_db, _cli_pages(args, locales),
+                            locales=locales, site_url=args.site_url)
+        print(f"✓ Synced {synced.upserted} pages to the CMS ({synced.unchanged} unchanged)")
+    return 0
 
-print(f"\n✓ Successfully generated {len(ALL_PAGES)} pages")
+if __name__ == "__main__":
+    sys.exit(main())
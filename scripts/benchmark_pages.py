@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Benchmark the IntelliCloud page generator
+
+Synthesises N page configs shaped like the ALL_PAGES entries and measures,
+for each size, generate_html on its own, end-to-end generation into a
+temporary directory, and the peak RSS of the process doing it. Every sample
+runs in a fresh interpreter so peak RSS is not inflated by earlier runs, and
+each size is sampled --repeat times; the min and median of each metric are
+recorded, and --compare only flags a metric when both regress. Peak RSS
+is compared from RSS_MIN_PAGES pages up, against --rss-threshold. The
+committed baseline is a reference, not a gate for any machine: re-record
+it with --save where --compare runs.
+
+Usage:
+  python scripts/benchmark_pages.py                    # run and print
+  python scripts/benchmark_pages.py --save             # record a baseline
+  python scripts/benchmark_pages.py --compare          # flag regressions
+  python scripts/benchmark_pages.py --sizes 100,1000 --repeat 9 --compare --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import generate_pages  # noqa: E402
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+DEFAULT_REPEAT = 5
+DEFAULT_BASELINE = os.path.join(ROOT_DIR, "scripts", "benchmark-baseline.json")
+
+# Timings that may regress, and the memory figure compared the same way
+METRICS = ["render_seconds", "generate_seconds", "peak_rss_kb"]
+# Peak RSS of a small run is mostly the interpreter and its imports, which
+# differ by several MiB between machines and Python builds, so it is only
+# compared from this size up, against its own threshold
+RSS_METRIC = "peak_rss_kb"
+RSS_MIN_PAGES = 10000
+DEFAULT_RSS_THRESHOLD = 0.25
+# Summaries of the samples that are recorded and compared
+STATISTICS = {"min": min, "median": statistics.median}
+
+
+def synthesize_pages(n):
+    """Return n page configs cycling through ALL_PAGES with unique paths"""
+    samples = list(generate_pages.ALL_PAGES.items())
+    pages = {}
+    for i in range(n):
+        path, config = samples[i % len(samples)]
+        base, ext = os.path.splitext(path)
+        pages[f"bench-{i // len(samples)}/{base}{ext}"] = dict(config, h1=f"{config['h1']} #{i}")
+    return pages
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB, or None where it is unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure(n, jobs):
+    """Time rendering and full generation of n synthetic pages"""
+    pages = synthesize_pages(n)
+    configs = list(pages.values())
+
+    start = time.perf_counter()
+    for config in configs:
+        generate_pages.generate_html(config)
+    render_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        generate_pages.build(pages, out_dir, force=True, jobs=jobs, verbose=False)
+        generate_seconds = time.perf_counter() - start
+
+    return {
+        "pages": n,
+        "jobs": jobs,
+        "render_seconds": round(render_seconds, 4),
+        "generate_seconds": round(generate_seconds, 4),
+        "pages_per_second": round(n / generate_seconds, 1),
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def run_size(n, jobs, repeat):
+    """Measure one size repeat times, each in a fresh interpreter, and summarise the samples"""
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--measure", str(n), "--jobs", str(jobs)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        samples.append(json.loads(output))
+
+    result = {"pages": n, "jobs": jobs, "repeat": repeat}
+    for metric in METRICS:
+        values = [sample[metric] for sample in samples if sample[metric] is not None]
+        result[metric] = {name: summary(values) for name, summary in STATISTICS.items()} if values else None
+    result["pages_per_second"] = round(n / result["generate_seconds"]["median"], 1)
+    return result
+
+
+def compare(results, baseline, threshold, rss_threshold=DEFAULT_RSS_THRESHOLD):
+    """Return a line per metric whose min and median are both worse than the baseline by more than threshold
+
+    A single slow sample moves neither, and a single lucky baseline sample
+    only moves the min, so noise alone does not fail the comparison. Peak
+    RSS uses rss_threshold, and only for sizes of RSS_MIN_PAGES or more.
+    """
+    regressions = []
+    for size, result in results.items():
+        previous = baseline.get(size)
+        if previous is None:
+            continue
+        for metric in METRICS:
+            before, after = previous.get(metric), result[metric]
+            if not before or not after:
+                continue
+            allowed = threshold
+            if metric == RSS_METRIC:
+                if int(size) < RSS_MIN_PAGES:
+                    continue
+                allowed = rss_threshold
+            if all(after[name] > before[name] * (1 + allowed) for name in STATISTICS):
+                changes = ", ".join(f"{name} {before[name]} -> {after[name]} (+{(after[name] / before[name] - 1) * 100:.0f}%)"
+                                    for name in STATISTICS)
+                regressions.append(f"{size} pages: {metric} {changes}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark generate_pages.py")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated page counts")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N", help="workers passed to generate_pages")
+    parser.add_argument("--repeat", "-r", type=int, default=DEFAULT_REPEAT, metavar="N",
+                        help=f"samples per size, summarised as min and median (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, metavar="JSON", help="baseline results file")
+    parser.add_argument("--save", action="store_true", help="write the results to the baseline file")
+    parser.add_argument("--compare", action="store_true", help="fail if results regress against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before --compare fails (default: 0.10)")
+    parser.add_argument("--rss-threshold", type=float, default=DEFAULT_RSS_THRESHOLD,
+                        help=f"allowed peak RSS growth, checked from {RSS_MIN_PAGES} pages up (default: {DEFAULT_RSS_THRESHOLD:.2f})")
+    parser.add_argument("--measure", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    if args.measure is not None:
+        json.dump(measure(args.measure, args.jobs), sys.stdout)
+        return 0
+
+    results = {}
+    for n in (int(size) for size in args.sizes.split(",")):
+        result = run_size(n, args.jobs, args.repeat)
+        results[str(n)] = result
+        render, generate, rss = (result[metric] for metric in METRICS)
+        print(f"{n:>7} pages: render {render['min']:.3f}s (median {render['median']:.3f}s), "
+              f"generate {generate['min']:.3f}s (median {generate['median']:.3f}s, {result['pages_per_second']:.0f} pages/s), "
+              + (f"peak RSS {rss['median'] / 1024:.1f} MiB" if rss else "peak RSS n/a"))
+
+    status = 0
+    if args.compare:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)["results"]
+        except OSError:
+            print(f"\n✗ No baseline at {args.baseline}; run with --save first")
+            return 1
+
+        regressions = compare(results, baseline, args.threshold, args.rss_threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            status = 1
+        else:
+            print(f"\n✓ No regressions beyond {args.threshold:.0%}")
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"\n✓ Baseline written to {args.baseline}")
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+-- Content hash of the page and SEO rows written by generate_pages.py --sync-db
+-- The sync compares it to decide which pages need to be sent again
+
+ALTER TABLE ic_web_pages ADD COLUMN IF NOT EXISTS content_hash TEXT;
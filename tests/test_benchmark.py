@@ -0,0 +1,37 @@
+"""scripts/benchmark_pages.py regression comparison"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import benchmark_pages  # noqa: E402
+
+
+def result(seconds, rss):
+    return {
+        "render_seconds": {"min": seconds, "median": seconds},
+        "generate_seconds": {"min": seconds, "median": seconds},
+        "peak_rss_kb": {"min": rss, "median": rss},
+    }
+
+
+def test_small_runs_ignore_interpreter_rss_differences():
+    baseline = {"100": result(1.0, 27276)}
+    assert benchmark_pages.compare({"100": result(1.0, 30536)}, baseline, 0.10) == []
+
+
+def test_large_runs_compare_rss_against_its_own_threshold():
+    baseline = {"10000": result(1.0, 50000)}
+    assert benchmark_pages.compare({"10000": result(1.0, 60000)}, baseline, 0.10) == []
+    assert benchmark_pages.compare({"10000": result(1.0, 70000)}, baseline, 0.10) == [
+        "10000 pages: peak_rss_kb min 50000 -> 70000 (+40%), median 50000 -> 70000 (+40%)"
+    ]
+
+
+def test_timings_regress_only_when_min_and_median_both_do():
+    baseline = {"100": result(1.0, 1)}
+    noisy = result(1.0, 1)
+    noisy["generate_seconds"]["median"] = 2.0
+    assert benchmark_pages.compare({"100": noisy}, baseline, 0.10) == []
+    assert len(benchmark_pages.compare({"100": result(2.0, 1)}, baseline, 0.10)) == 2
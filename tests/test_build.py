@@ -0,0 +1,166 @@
+"""Incremental builds and the manifest that drives them"""
+
+import json
+import stat
+import threading
+
+import pytest
+
+import generate_pages
+
+PAGES = {path: generate_pages.ALL_PAGES[path] for path in (
+    "services/ecommerce/index.html",
+    "services/ecommerce/shopify.html",
+    "services/ecommerce/custom-platforms.html",
+)}
+
+
+def build(out_dir, pages=PAGES, **kwargs):
+    return generate_pages.build(pages, str(out_dir), verbose=False, **kwargs)
+
+
+def manifest(out_dir):
+    return json.loads((out_dir / generate_pages.MANIFEST_NAME).read_text(encoding="utf-8"))
+
+
+def test_first_build_writes_every_page_and_records_it(tmp_path):
+    result = build(tmp_path, locales=["en", "fr"])
+
+    assert (result.written, result.skipped) == (6, 0)
+    assert (tmp_path / "fr/services/ecommerce/shopify.html").exists()
+    recorded = manifest(tmp_path)
+    assert recorded["template_version"] == generate_pages.template_fingerprint()
+    assert set(recorded["pages"]) == {f"{locale}/{path}" for locale in ("en", "fr") for path in PAGES}
+    assert not (tmp_path / generate_pages.STAGING_NAME).exists()
+
+
+def test_unchanged_rebuild_skips_and_force_rewrites(tmp_path):
+    build(tmp_path)
+    result = build(tmp_path)
+    assert (result.written, result.skipped) == (0, 3)
+    assert build(tmp_path, force=True).written == 3
+
+
+def test_only_the_edited_page_is_rewritten(tmp_path):
+    build(tmp_path)
+    shopify = tmp_path / "en/services/ecommerce/shopify.html"
+    index = tmp_path / "en/services/ecommerce/index.html"
+    untouched = index.stat().st_mtime_ns
+
+    edited = dict(PAGES, **{"services/ecommerce/shopify.html": dict(PAGES["services/ecommerce/shopify.html"], h1="Shopify Stores")})
+    result = build(tmp_path, edited)
+
+    assert (result.written, result.skipped) == (1, 2)
+    assert "Shopify Stores" in shopify.read_text(encoding="utf-8")
+    assert index.stat().st_mtime_ns == untouched
+
+
+def test_parallel_build_is_byte_identical_to_a_serial_one(tmp_path):
+    outputs = {}
+    for jobs in (1, 3):
+        out_dir = tmp_path / f"jobs-{jobs}"
+        build(out_dir, generate_pages.ALL_PAGES, locales=["en", "fr"], jobs=jobs, minify=True, compress=(".gz",), seo_dir=str(out_dir / "seo"))
+        outputs[jobs] = {
+            path.relative_to(out_dir): path.read_bytes() for path in sorted(out_dir.rglob("*"))
+            if path.is_file() and path.name not in (generate_pages.MANIFEST_NAME, generate_pages.VITE_INPUT_NAME)
+        }
+
+    assert len(outputs[1]) > 2 * len(generate_pages.ALL_PAGES)
+    assert outputs[1] == outputs[3]
+
+
+def test_deleted_page_is_rewritten(tmp_path):
+    build(tmp_path)
+    (tmp_path / "en/services/ecommerce/shopify.html").unlink()
+    assert build(tmp_path).written == 1
+
+
+def test_missing_compressed_sibling_is_rewritten(tmp_path):
+    build(tmp_path, compress=(".gz",))
+    sibling = tmp_path / "en/services/ecommerce/shopify.html.gz"
+    sibling.unlink()
+
+    assert build(tmp_path, compress=(".gz",)).written == 1
+    assert sibling.exists()
+
+
+def test_changed_output_options_rewrite_every_page(tmp_path):
+    build(tmp_path)
+    assert build(tmp_path, minify=True).written == 3
+
+
+def test_stale_template_version_rewrites_every_page(tmp_path):
+    build(tmp_path)
+    recorded = manifest(tmp_path)
+    recorded["template_version"] = "stale"
+    (tmp_path / generate_pages.MANIFEST_NAME).write_text(json.dumps(recorded), encoding="utf-8")
+
+    assert build(tmp_path).written == 3
+    assert manifest(tmp_path)["template_version"] == generate_pages.template_fingerprint()
+
+
+def test_hand_written_page_is_not_replaced_without_force(tmp_path):
+    build(tmp_path)
+    about = tmp_path / "en/about.html"
+    about.write_text("<p>hand-written</p>", encoding="utf-8")
+    pages = dict(PAGES, **{"about.html": PAGES["services/ecommerce/shopify.html"]})
+
+    with pytest.raises(generate_pages.OverwriteError, match="did not write"):
+        build(tmp_path, pages)
+    assert about.read_text(encoding="utf-8") == "<p>hand-written</p>"
+
+    assert build(tmp_path, pages, force=True).written == 4
+
+
+def test_hand_written_page_is_kept_without_a_manifest(tmp_path):
+    build(tmp_path)
+    (tmp_path / generate_pages.MANIFEST_NAME).unlink()
+    about = tmp_path / "en/about.html"
+    about.write_text("<p>hand-written</p>", encoding="utf-8")
+    pages = dict(PAGES, **{"about.html": PAGES["services/ecommerce/shopify.html"]})
+
+    with pytest.raises(generate_pages.OverwriteError, match="about.html"):
+        build(tmp_path, pages)
+    assert about.read_text(encoding="utf-8") == "<p>hand-written</p>"
+
+    # Pages an earlier run wrote still carry the marker, so they are replaced
+    assert build(tmp_path).written == 3
+
+
+def test_invalid_config_writes_nothing(tmp_path):
+    pages = dict(PAGES, **{"services/ecommerce/bad.html": {"title": "Bad", "h1": "Bad"}})
+
+    with pytest.raises(generate_pages.ConfigError, match="bad.html"):
+        build(tmp_path, pages)
+    assert not (tmp_path / "en/services/ecommerce/shopify.html").exists()
+
+
+def test_fsync_flushes_each_page_on_a_writer_thread_and_each_directory_once(tmp_path, monkeypatch):
+    fsynced = []
+    fsync = generate_pages.os.fsync
+
+    def record(fd):
+        fsynced.append((stat.S_ISDIR(generate_pages.os.fstat(fd).st_mode), threading.current_thread() is threading.main_thread()))
+        fsync(fd)
+
+    monkeypatch.setattr(generate_pages.os, "fsync", record)
+    monkeypatch.setattr(generate_pages.os, "sync", lambda: fsynced.append("sync"), raising=False)
+
+    assert build(tmp_path, compress=(".gz",), fsync=True).written == 3
+
+    # Three pages and their .gz siblings, fsynced off the main thread, then their one directory
+    assert sorted(fsynced) == [(False, False)] * 6 + [(True, True)]
+
+
+def test_vite_input_lists_pages_with_a_fingerprint_that_changes_when_pages_are_added(tmp_path):
+    build(tmp_path)
+    (tmp_path / "en/about.html").write_text("<p>hand-written</p>", encoding="utf-8")
+    generate_pages.build({}, str(tmp_path), verbose=False)
+    listed = json.loads((tmp_path / generate_pages.VITE_INPUT_NAME).read_text(encoding="utf-8"))
+
+    assert listed["pages"]["en/about"] == f"{generate_pages.os.path.relpath(tmp_path, generate_pages.ROOT_DIR)}/en/about.html"
+    assert listed["root"] == ["en"]
+    assert listed == {"pages": listed["pages"], **generate_pages.tree_fingerprint(str(tmp_path))}
+
+    (tmp_path / "en/services/ecommerce/new.html").write_text("<p>new</p>", encoding="utf-8")
+    assert generate_pages.tree_fingerprint(str(tmp_path))["dirs"] != listed["dirs"]
@@ -0,0 +1,54 @@
+"""Rendering pages from a CMS snapshot: .sql replay, row merging and escaping"""
+
+import generate_pages
+
+# pg_dump --data-only --inserts output from before content_hash was added:
+# 11 positional values per row against the 12-column SQLITE_SCHEMA
+DUMP = """--
+-- PostgreSQL database dump
+--
+
+INSERT INTO public.ic_web_pages VALUES ('1', 'en/services/ecommerce/shopify', 'en', 'Shopify | IntelliCloud', 'Shopify stores', '{"h1": "Shopify", "breadcrumb": "Shopify"}', 'published', '2025-01-01', '2025-01-01', NULL, NULL);
+INSERT INTO public.ic_web_pages VALUES ('2', 'en/services/ecommerce/index', 'en', 'eCommerce | IntelliCloud', 'Online stores', '{"h1": "eCommerce", "breadcrumb": "eCommerce"}', 'published', '2025-01-01', '2025-01-01', NULL, NULL);
+INSERT INTO public.ic_web_pages VALUES ('3', 'fr/services/ecommerce/index', 'fr', 'Commerce | IntelliCloud', 'Boutiques', '{"h1": "Commerce", "breadcrumb": "Commerce"}', 'published', '2025-01-01', '2025-01-01', NULL, NULL);
+INSERT INTO public.ic_web_pages VALUES ('4', 'fr/seulement-fr', 'fr', 'Seulement | IntelliCloud', 'Page française', '{}', 'published', '2025-01-01', '2025-01-01', NULL, NULL);
+INSERT INTO public.ic_web_pages VALUES ('5', 'en/draft', 'en', 'Draft | IntelliCloud', 'Not yet', '{}', 'draft', '2025-01-01', '2025-01-01', NULL, NULL);
+INSERT INTO public.ic_web_pages VALUES ('6', 'en/services/quotes', 'en', 'Quotes & more | IntelliCloud', 'All "our" services; it''s great', '{"h1": "<Quotes>"}', 'published', '2025-01-01', '2025-01-01', NULL, NULL);
+INSERT INTO public.ic_web_other VALUES ('ignored');
+"""
+
+
+def dump(tmp_path):
+    path = tmp_path / "cms.sql"
+    path.write_text(DUMP, encoding="utf-8")
+    return str(path)
+
+
+def test_short_inserts_replay_into_the_leading_columns(tmp_path):
+    connection, dialect = generate_pages.open_snapshot(dump(tmp_path))
+
+    assert dialect == "sqlite"
+    assert connection.execute("SELECT COUNT(*), COUNT(content_hash) FROM ic_web_pages").fetchone() == (6, 0)
+    assert connection.execute("SELECT status FROM ic_web_pages WHERE id = '5'").fetchone() == ("draft",)
+
+
+def test_pages_stream_parents_first_with_locale_overrides(tmp_path):
+    pages = list(generate_pages.iter_cms_pages(dump(tmp_path), ["en", "fr"]))
+
+    paths = [path for path, _ in pages]
+    assert paths == ["services/ecommerce/index.html", "services/ecommerce/shopify.html", "services/quotes.html"]
+    index = dict(pages)["services/ecommerce/index.html"]
+    assert index["h1"] == "eCommerce"
+    assert index["locales"]["fr"]["breadcrumb"] == "Commerce"
+
+
+def test_cms_values_are_escaped_in_the_rendered_page(tmp_path):
+    out_dir = tmp_path / "pages"
+    generate_pages.build(generate_pages.iter_cms_pages(dump(tmp_path)), str(out_dir), verbose=False)
+    html = (out_dir / "en/services/quotes.html").read_text(encoding="utf-8")
+
+    assert '<meta name="description" content="All &quot;our&quot; services; it&#x27;s great">' in html
+    assert "<title>Quotes &amp; more | IntelliCloud</title>" in html
+    assert "&lt;Quotes&gt;</h1>" in html
+    shopify = (out_dir / "en/services/ecommerce/shopify.html").read_text(encoding="utf-8")
+    assert 'href="/src/pages/en/services/ecommerce/index.html"' in shopify
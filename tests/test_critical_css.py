@@ -0,0 +1,58 @@
+"""Critical CSS built per palette through the Tailwind CLI"""
+
+import sys
+
+import pytest
+
+import generate_pages
+
+PAGES = {"services/ecommerce/shopify.html": generate_pages.ALL_PAGES["services/ecommerce/shopify.html"]}
+
+# Stands in for node_modules/.bin/tailwindcss: logs each call and prints a
+# rule naming whether the content it was given holds the palette's classes
+FAKE_TAILWIND = """
+import sys
+args = sys.argv[1:]
+content = open(args[args.index("--content") + 1], encoding="utf-8").read()
+with open(sys.argv[0] + ".log", "a") as log:
+    log.write("call\\n")
+print("*,::before{box-sizing:border-box}.container{width:100%}" + (".text-green-600{color:#16a34a}" if "text-green-600" in content else ""))
+"""
+
+
+@pytest.fixture
+def tailwind(tmp_path, monkeypatch):
+    script = tmp_path / "tailwindcss.py"
+    script.write_text(FAKE_TAILWIND, encoding="utf-8")
+    monkeypatch.setattr(generate_pages, "TAILWIND_CLI", (sys.executable, str(script)))
+    return tmp_path / "tailwindcss.py.log"
+
+
+def test_skeleton_holds_the_classes_of_every_nav_state_and_the_palette():
+    skeleton = generate_pages.critical_skeleton("green")
+
+    assert 'class="container' in skeleton
+    assert "text-green-600" in skeleton
+    assert "font-semibold text-blue-600" in skeleton
+    assert "hover:text-blue-600 transition-colors" in skeleton
+
+
+def test_pages_inline_their_palettes_css_built_once_and_cached(tmp_path, tailwind):
+    out_dir = tmp_path / "pages"
+    generate_pages.build(PAGES, str(out_dir), critical_css=True, verbose=False)
+    html = (out_dir / "en/services/ecommerce/shopify.html").read_text(encoding="utf-8")
+
+    assert "<style>*,::before{box-sizing:border-box}.container{width:100%}.text-green-600{color:#16a34a}\n</style>" in html
+    assert 'media="print" onload="this.media=\'all\'"' in html
+    assert tailwind.read_text().count("call") == len(generate_pages.PALETTES)
+
+    assert generate_pages.build(PAGES, str(out_dir), critical_css=True, verbose=False).written == 0
+    assert tailwind.read_text().count("call") == len(generate_pages.PALETTES)
+
+
+def test_missing_tailwind_cli_stops_the_build(tmp_path, monkeypatch):
+    monkeypatch.setattr(generate_pages, "TAILWIND_CLI", (str(tmp_path / "missing"),))
+
+    with pytest.raises(generate_pages.AssetError, match="Tailwind CLI"):
+        generate_pages.build(PAGES, str(tmp_path / "pages"), critical_css=True, verbose=False)
+    assert not (tmp_path / "pages/en").exists()
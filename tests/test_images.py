@@ -0,0 +1,30 @@
+"""Resized image variants"""
+
+import os
+
+import pytest
+
+import generate_pages
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def test_jpeg_sources_keep_their_extension_and_svg_is_copied_as_is(tmp_path, monkeypatch):
+    images = tmp_path / "src" / "images"
+    images.mkdir(parents=True)
+    Image.new("RGB", (300, 100), "red").save(images / "team.jpg", "JPEG")
+    Image.new("RGB", (300, 100), "blue").save(images / "office.jpeg", "JPEG")
+    (images / "logo.svg").write_text('<svg xmlns="http://www.w3.org/2000/svg"/>')
+    monkeypatch.setattr(generate_pages, "ROOT_DIR", str(tmp_path))
+
+    published = dict(generate_pages.publish_images(
+        ["/src/images/team.jpg", "/src/images/office.jpeg", "/src/images/logo.svg"],
+        image_dir=str(tmp_path / "out"), cache_dir=str(tmp_path / "cache"),
+    ))
+
+    url, srcset, _ = published["/src/images/team.jpg"]
+    assert url.endswith(".jpg") and "-256w." in srcset
+    assert published["/src/images/office.jpeg"][0].endswith(".jpeg")
+    url, srcset, sources = published["/src/images/logo.svg"]
+    assert url.startswith("/images/logo.") and url.endswith(".svg") and (srcset, sources) == ("", ())
+    assert len(os.listdir(tmp_path / "out")) > 3
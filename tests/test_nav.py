@@ -0,0 +1,56 @@
+"""The shared nav: per-locale rendering and --renav"""
+
+import re
+
+import pytest
+
+import generate_pages
+
+
+def header(html):
+    return html[html.index("<header"):html.index("</header>")]
+
+
+def test_french_nav_links_to_french_pages_with_french_labels():
+    path = "services/ecommerce/shopify.html"
+    nav = header(generate_pages.generate_html(generate_pages.ALL_PAGES[path], "fr", path))
+
+    assert re.findall(r'href="/src/pages/en/[^"]*"', nav) == ['href="/src/pages/en/index.html"']
+    assert 'href="/src/pages/fr/services/ecommerce/shopify.html"' in nav
+    assert ">Accueil</a>" in nav and "Génération de leads" in nav
+    assert ">Home<" not in nav and ">Get Started<" not in nav
+
+
+def test_missing_nav_marker_is_an_error(tmp_path, monkeypatch):
+    template = tmp_path / "nav.txt"
+    with open(generate_pages.NAV_TEMPLATE_PATH, encoding="utf-8") as f:
+        template.write_text(f.read().replace("SERVICES_ACTIVE", "hover:text-blue-600"), encoding="utf-8")
+    monkeypatch.setattr(generate_pages, "NAV_TEMPLATE_PATH", str(template))
+    generate_pages.nav_template.cache_clear()
+
+    try:
+        with pytest.raises(generate_pages.TemplateError, match="SERVICES_ACTIVE"):
+            generate_pages.nav_template()
+    finally:
+        generate_pages.nav_template.cache_clear()
+
+
+def test_replace_header_swaps_only_the_header_and_only_when_it_changed(tmp_path):
+    page = tmp_path / "page.html"
+    page.write_text("<body>\n  <!-- Header -->\n  <header>\n    old\n  </header>\n\n  <main>kept</main>\n", encoding="utf-8")
+
+    assert generate_pages._replace_header(str(page), "  <header>new</header>")
+    assert page.read_text(encoding="utf-8") == "<body>\n  <header>new</header>\n\n  <main>kept</main>\n"
+    assert not generate_pages._replace_header(str(page), "  <header>new</header>")
+    assert [path.name for path in tmp_path.iterdir()] == ["page.html"]
+
+
+def test_renav_restores_the_nav_of_every_locale(tmp_path):
+    path = "services/ecommerce/shopify.html"
+    generate_pages.build({path: generate_pages.ALL_PAGES[path]}, str(tmp_path), locales=["en", "fr"], verbose=False)
+    page = tmp_path / "fr" / path
+    built = page.read_text(encoding="utf-8")
+    page.write_text(built.replace("Accueil</a>", "Home</a>", 1), encoding="utf-8")
+
+    assert generate_pages.renav(str(tmp_path), verbose=False) == 1
+    assert page.read_text(encoding="utf-8") == built
@@ -0,0 +1,17 @@
+"""--minify: collapsed markup with significant whitespace left alone"""
+
+import generate_pages
+
+
+def test_minify_collapses_markup_but_copies_verbatim_elements():
+    pre = "<pre>\n  line one\n\n    line two\n</pre>"
+    script = "<script>\n  // keep <!-- this -->\n  let a = 1;\n</script>"
+    style = "<STYLE media=\"print\">\n  p {\n    color: red;\n  }\n</STYLE>"
+    textarea = "<textarea name=\"q\">\n  typed\n</textarea>"
+    html = f"<div>\n  <!-- drop -->\n  <p>a</p>\n  {pre}\n  {script}\n  {style}\n  {textarea}\n  <!--[if IE]>ie<![endif]-->\n</div>\n"
+
+    assert generate_pages.minify_html(html) == f"<div> <p>a</p> {pre} {script} {style} {textarea} <!--[if IE]>ie<![endif]--> </div>"
+
+
+def test_minify_leaves_single_line_spacing_alone():
+    assert generate_pages.minify_html("<p>two  spaces</p>") == "<p>two  spaces</p>"
@@ -0,0 +1,87 @@
+"""Stats, breadcrumbs, matrix expansion and the link checker"""
+
+import pytest
+
+import generate_pages
+
+
+def test_trail_finds_index_and_sibling_parents():
+    index = generate_pages.PageIndex([
+        ("services/index.html", {"h1": "Services"}),
+        ("services/ecommerce.html", {"h1": "E-commerce", "breadcrumb": "eCommerce", "locales": {"fr": {"breadcrumb": "Commerce"}}}),
+        ("services/ecommerce/shopify.html", {"h1": "Shopify"}),
+    ])
+
+    assert index.parent("services/ecommerce/shopify.html") == "services/ecommerce.html"
+    assert index.trail("services/ecommerce/shopify.html", "en") == (("Services", "services/index.html"), ("eCommerce", "services/ecommerce.html"))
+    assert index.trail("services/ecommerce/shopify.html", "fr")[-1] == ("Commerce", "services/ecommerce.html")
+    assert index.trail("services/index.html", "en") == ()
+
+
+@pytest.mark.parametrize("stat, parts", [
+    ("75+ GCP Projects", ("75+", "GCP Projects")),
+    ("Award-Winning", ("Award-Winning", "")),
+    ("24/7", ("24/7", "")),
+])
+def test_split_stat_splits_on_the_first_space_only(stat, parts):
+    assert generate_pages.split_stat(stat) == parts
+
+
+def test_rendered_page_links_every_ancestor_and_lists_them_in_json_ld():
+    pages = generate_pages.ALL_PAGES
+    index = generate_pages.PageIndex(pages.items())
+    path = "services/ecommerce/shopify.html"
+    html = generate_pages.generate_html(pages[path], "en", path, index.trail(path, "en"))
+
+    assert 'href="/src/pages/en/services/ecommerce/index.html"' in html
+    assert '"@type":"BreadcrumbList"' in html
+
+
+def test_matrix_expands_every_combination_and_escapes_json():
+    config = {"title": "{service_name} in {city_name}", "h1": "{city_name}"}
+    dimensions = {
+        "city": [{"name": "Quebec City"}, {"name": 'Saint "Jean"', "slug": "st-jean"}],
+        "service": [{"name": "SEO"}],
+    }
+
+    variants = dict(generate_pages.expand_matrix("local/{service}/{city}.html", config, dimensions))
+
+    assert set(variants) == {"local/seo/quebec-city.html", "local/seo/st-jean.html"}
+    assert variants["local/seo/st-jean.html"] == {"title": 'SEO in Saint "Jean"', "h1": 'Saint "Jean"'}
+
+
+def test_matrix_rejects_unknown_placeholders():
+    with pytest.raises(generate_pages.ConfigError, match="region"):
+        list(generate_pages.expand_matrix("{region}.html", {}, {"city": [{"name": "Laval"}]}))
+
+
+@pytest.mark.parametrize("path, row", [
+    ("local/{city_name}.html", {"name": "../../../index"}),
+    ("{city_name}", {"name": "/etc/index.html"}),
+])
+def test_matrix_keeps_variants_inside_the_locale_dir(path, row):
+    variants = generate_pages.expand_matrix(path, {}, {"city": [{"name": "Laval"}, row]})
+
+    with pytest.raises(generate_pages.ConfigError, match="leaves the locale directory"):
+        list(variants)
+
+
+def test_matrix_slugifies_the_slug_column():
+    variants = dict(generate_pages.expand_matrix("local/{city}.html", {}, {"city": [{"name": "Laval", "slug": "../../Trois Rivieres"}]}))
+
+    assert set(variants) == {"local/trois-rivieres.html"}
+
+
+def test_broken_links_reports_missing_pages_and_files(tmp_path):
+    pages_dir = tmp_path / "pages"
+    (pages_dir / "en").mkdir(parents=True)
+    (pages_dir / "en/index.html").write_text(
+        '<a href="about.html">ok</a> <a href="/src/pages/en/missing.html">gone</a> '
+        '<a href="/logo.png">missing file</a> <a href="https://example.com/">external</a> <a href="#top">fragment</a>',
+        encoding="utf-8",
+    )
+    (pages_dir / "en/about.html").write_text('<a href="index.html#team">back</a>', encoding="utf-8")
+
+    broken = generate_pages.find_broken_links(str(pages_dir), static_dirs=(str(tmp_path),))
+
+    assert sorted(broken) == [("en/index.html", "/logo.png"), ("en/index.html", "/src/pages/en/missing.html")]
@@ -0,0 +1,55 @@
+"""--serve: pages rendered on request, cached and invalidated by page hash"""
+
+import json
+import os
+
+import pytest
+
+import generate_pages
+
+
+def write_structure(path, parent="Services", child="Cloud"):
+    nodes = [{"id": "Services", "title": parent, "children": [{"id": "Cloud", "title": child}]}]
+    path.write_text(json.dumps({"site": {"nodes": nodes}}), encoding="utf-8")
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    monkeypatch.setattr(generate_pages, "critical_stylesheets", lambda cache_dir: ())
+    structure = tmp_path / "site.json"
+    write_structure(structure)
+    return structure, generate_pages.PreviewSite(str(structure), locales=["en", "fr"], cache_size=2)
+
+
+def test_second_view_is_a_cache_hit_with_the_same_etag(site):
+    _, preview = site
+
+    etag, body, hit = preview.page("/src/pages/en/services/cloud.html")
+    assert not hit and b"<h1" in body
+    assert preview.page("/src/pages/en/services/cloud.html") == (etag, body, True)
+    assert preview.page("/src/pages/de/services/cloud.html") is None
+    assert preview.page("/src/pages/en/missing.html") is None
+    assert preview.page("/src/styles/tailwind.css") is None
+
+
+def test_editing_a_parent_invalidates_the_child_through_its_trail(site):
+    structure, preview = site
+    etag, _, _ = preview.page("/src/pages/fr/services/cloud.html")
+
+    mtime = structure.stat().st_mtime_ns
+    write_structure(structure, parent="Solutions")
+    # Move the mtime on in case the filesystem's resolution hides the edit
+    os.utime(structure, ns=(mtime + 10**9, mtime + 10**9))
+    new_etag, body, hit = preview.page("/src/pages/fr/services/cloud.html")
+
+    assert not hit and new_etag != etag
+    assert b">Solutions</a>" in body
+
+
+def test_cache_keeps_only_the_most_recent_pages(site):
+    _, preview = site
+    for url in ("/src/pages/en/services/index.html", "/src/pages/en/services/cloud.html", "/src/pages/fr/services/cloud.html"):
+        preview.page(url)
+
+    assert list(preview.cache) == [("en", "services/cloud.html"), ("fr", "services/cloud.html")]
+    assert not preview.page("/src/pages/en/services/index.html")[2]
@@ -0,0 +1,32 @@
+"""sitemap.xml, robots.txt and the search index streamed during a build"""
+
+import json
+
+import generate_pages
+
+
+def write_index(out_dir, pages, max_urls):
+    writer = generate_pages.SiteIndexWriter(str(out_dir), "https://example.com/", max_urls)
+    for i in range(pages):
+        writer.add(f"en/page-{i}.html", "2025-01-01", {"title": f"Page {i}", "desc": "", "services": []})
+    writer.close()
+
+
+def test_sitemap_rolls_over_into_an_index_past_max_urls(tmp_path):
+    write_index(tmp_path, 5, max_urls=2)
+
+    index = (tmp_path / "sitemap.xml").read_text(encoding="utf-8")
+    assert "<sitemapindex" in index
+    assert all(f"<loc>https://example.com/sitemap-{n}.xml</loc>" in index for n in (1, 2, 3))
+    assert [(tmp_path / f"sitemap-{n}.xml").read_text(encoding="utf-8").count("<url>") for n in (1, 2, 3)] == [2, 2, 1]
+    assert len(json.loads((tmp_path / "search-index.json").read_text(encoding="utf-8"))) == 5
+    assert "Sitemap: https://example.com/sitemap.xml" in (tmp_path / "robots.txt").read_text(encoding="utf-8")
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_exactly_max_urls_stays_a_single_sitemap_and_drops_stale_parts(tmp_path):
+    write_index(tmp_path, 5, max_urls=2)
+    write_index(tmp_path, 2, max_urls=2)
+
+    assert "<urlset" in (tmp_path / "sitemap.xml").read_text(encoding="utf-8")
+    assert not list(tmp_path.glob("sitemap-*.xml"))
@@ -0,0 +1,61 @@
+"""snapshot_version and its content-addressed store"""
+
+import json
+import os
+import stat
+import subprocess
+
+import generate_pages
+
+
+def project(tmp_path):
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "index.html").write_text("<h1>home</h1>", encoding="utf-8")
+    (root / "src/app.js").write_text("console.log(1)", encoding="utf-8")
+    (root / "src/copy.js").write_text("console.log(1)", encoding="utf-8")
+    (root / ".env.production").write_text("SECRET=1", encoding="utf-8")
+    subprocess.run(["git", "init", "-q", str(root)], check=True)
+    subprocess.run(["git", "-C", str(root), "add", "."], check=True)
+    (root / "notes.txt").write_text("untracked", encoding="utf-8")
+    (root / ".env.local").write_text("SECRET=2", encoding="utf-8")
+    return root
+
+
+def test_snapshot_takes_tracked_files_only_and_never_env_files(tmp_path):
+    root = project(tmp_path)
+    version_dir = tmp_path / "version"
+
+    result = generate_pages.snapshot_version("1", str(root), str(version_dir))
+
+    snapshot = sorted(str(path.relative_to(version_dir / "1")) for path in (version_dir / "1").rglob("*") if path.is_file())
+    assert snapshot == ["index.html", "src/app.js", "src/copy.js"]
+    assert (result.files, result.new_objects) == (3, 2)
+    manifest = json.loads((version_dir / generate_pages.STORE_NAME / "1.json").read_text(encoding="utf-8"))
+    assert manifest["src/app.js"] == manifest["src/copy.js"]
+
+
+def test_store_objects_are_read_only_and_shared_between_versions(tmp_path):
+    root = project(tmp_path)
+    version_dir = tmp_path / "version"
+    generate_pages.snapshot_version("1", str(root), str(version_dir))
+    (root / "index.html").write_text("<h1>edited</h1>", encoding="utf-8")
+
+    result = generate_pages.snapshot_version("2", str(root), str(version_dir))
+
+    assert (result.files, result.new_objects) == (3, 1)
+    assert (version_dir / "1/index.html").read_text(encoding="utf-8") == "<h1>home</h1>"
+    assert os.path.samefile(version_dir / "1/src/app.js", version_dir / "2/src/app.js")
+    assert not os.stat(version_dir / "2/src/app.js").st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+
+def test_snapshot_outside_git_skips_caches_and_env_files(tmp_path):
+    root = tmp_path / "plain"
+    (root / ".pytest_cache").mkdir(parents=True)
+    (root / ".pytest_cache/state").write_text("x", encoding="utf-8")
+    (root / ".env.local").write_text("SECRET=2", encoding="utf-8")
+    (root / "index.html").write_text("<h1>home</h1>", encoding="utf-8")
+    version_dir = tmp_path / "version"
+
+    assert generate_pages.snapshot_version("1", str(root), str(version_dir)).files == 1
+    assert os.listdir(version_dir / "1") == ["index.html"]
@@ -0,0 +1,65 @@
+"""sync_pages round trips against a throwaway SQLite database"""
+
+import generate_pages
+
+PAGES = {path: generate_pages.ALL_PAGES[path] for path in (
+    "services/ecommerce/index.html",
+    "services/ecommerce/shopify.html",
+    "services/ecommerce/custom-platforms.html",
+)}
+
+
+def db(tmp_path):
+    url = f"sqlite:///{tmp_path / 'cms.db'}"
+    connection, _ = generate_pages.connect_db(url)
+    return url, connection
+
+
+def test_first_sync_inserts_page_and_seo_rows(tmp_path):
+    url, connection = db(tmp_path)
+    result = generate_pages.sync_pages(url, PAGES, locales=["en", "fr"])
+
+    assert (result.upserted, result.unchanged) == (6, 0)
+    rows = dict(connection.execute("SELECT slug, title FROM ic_web_pages"))
+    assert rows["en/services/ecommerce/shopify"] == PAGES["services/ecommerce/shopify.html"]["title"]
+    assert "fr/services/ecommerce/index" in rows
+    assert connection.execute("SELECT COUNT(*) FROM ic_web_seo_meta").fetchone() == (6,)
+
+
+def test_unchanged_resync_writes_nothing(tmp_path):
+    url, connection = db(tmp_path)
+    generate_pages.sync_pages(url, PAGES)
+    before = connection.execute("SELECT id, updated_at FROM ic_web_seo_meta ORDER BY id").fetchall()
+
+    result = generate_pages.sync_pages(url, PAGES)
+
+    assert (result.upserted, result.unchanged) == (0, 3)
+    assert connection.execute("SELECT id, updated_at FROM ic_web_seo_meta ORDER BY id").fetchall() == before
+
+
+def test_changed_page_is_updated_in_place_and_its_seo_row_replaced(tmp_path):
+    url, connection = db(tmp_path)
+    generate_pages.sync_pages(url, PAGES)
+    slug = "en/services/ecommerce/shopify"
+    page_id, = connection.execute("SELECT id FROM ic_web_pages WHERE slug = ?", (slug,)).fetchone()
+    seo_id, = connection.execute("SELECT id FROM ic_web_seo_meta WHERE page_id = ?", (page_id,)).fetchone()
+
+    edited = dict(PAGES, **{"services/ecommerce/shopify.html": dict(PAGES["services/ecommerce/shopify.html"], title="Shopify Stores | IntelliCloud")})
+    result = generate_pages.sync_pages(url, edited)
+
+    assert (result.upserted, result.unchanged) == (1, 2)
+    assert connection.execute("SELECT id, title FROM ic_web_pages WHERE slug = ?", (slug,)).fetchone() == (page_id, "Shopify Stores | IntelliCloud")
+    seo = connection.execute("SELECT id, meta_title FROM ic_web_seo_meta WHERE page_id = ?", (page_id,)).fetchall()
+    assert len(seo) == 1
+    assert seo[0][0] != seo_id
+    assert seo[0][1] == "Shopify Stores | IntelliCloud"
+    assert connection.execute("SELECT COUNT(*) FROM ic_web_seo_meta").fetchone() == (3,)
+
+
+def test_batches_smaller_than_the_page_count(tmp_path):
+    url, connection = db(tmp_path)
+    result = generate_pages.sync_pages(url, PAGES, locales=["en", "fr"], batch_size=4)
+
+    assert result.upserted == 6
+    assert connection.execute("SELECT COUNT(*) FROM ic_web_pages").fetchone() == (6,)
+    assert connection.execute("SELECT COUNT(*) FROM ic_web_seo_meta").fetchone() == (6,)
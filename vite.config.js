@@ -1,31 +1,81 @@
 import { defineConfig } from 'vite'
 import { resolve } from 'path'
 import { glob } from 'glob'
-import { copyFileSync, mkdirSync, readdirSync, statSync } from 'fs'
+import { copyFileSync, existsSync, linkSync, mkdirSync, readFileSync, readdirSync, rmSync, statSync } from 'fs'
 import { join } from 'path'
 
-// Get all HTML files for multi-page build
-const files = glob.sync('src/pages/**/*.html')
+// Multi-page entries: generate_pages.py writes every page under src/pages
+// (generated and hand-written) to src/pages/vite-input.json as
+// { "pages": { "en/services/index": "src/pages/en/services/index.html", ... },
+//   "root": [...], "dirs": { "en/services": "<mtime ns>", ... } }.
+// The file is git-ignored; without it, or when the tree fingerprint shows
+// pages were added or deleted since it was written, the tree is globbed.
+// Checking the fingerprint costs one stat per directory, not a glob.
+const pagesDir = resolve(__dirname, 'src/pages')
+const pagesManifest = resolve(pagesDir, 'vite-input.json')
+
+function rootEntries() {
+  return readdirSync(pagesDir, { withFileTypes: true })
+    .filter(entry => !entry.name.startsWith('.') && (entry.isDirectory() || entry.name.endsWith('.html')))
+    .map(entry => entry.name)
+    .sort()
+}
+
+function isFresh({ root, dirs }) {
+  if (!root || !dirs || rootEntries().join('\0') !== root.join('\0')) return false
+  return Object.entries(dirs).every(([dir, mtime]) => {
+    try {
+      return statSync(join(pagesDir, dir), { bigint: true }).mtimeNs.toString() === mtime
+    } catch {
+      return false
+    }
+  })
+}
+
+function globPages() {
+  return Object.fromEntries(glob.sync('src/pages/**/*.html').map(file => [file.replace('src/pages/', '').replace(/\.html$/, ''), file]))
+}
+
+let pages
+if (existsSync(pagesManifest)) {
+  const listed = JSON.parse(readFileSync(pagesManifest, 'utf-8'))
+  if (isFresh(listed)) {
+    pages = listed.pages
+  } else {
+    console.warn('! src/pages/vite-input.json is out of date (pages were added or deleted since it was written); globbing src/pages, run python generate_pages.py to refresh it')
+    pages = globPages()
+  }
+} else {
+  pages = globPages()
+}
+
 const input = {
   main: resolve(__dirname, 'index.html'),
   admin: resolve(__dirname, 'admin.html'),
 }
 
-files.forEach(file => {
-  const name = file.replace('src/pages/', '').replace('/index.html', '').replace('.html', '')
+Object.entries(pages).forEach(([name, file]) => {
   input[name] = resolve(__dirname, file)
 })
 
-// Function to recursively copy directories
-function copyDirRecursive(src, dst) {
+// Recursively mirror a directory with hardlinks, copying only where linking
+// fails. version/<n>/ files are hardlinks into version/.store (see
+// generate_pages.py --snapshot), which is skipped, so no bytes are copied.
+function linkDirRecursive(src, dst) {
   mkdirSync(dst, { recursive: true })
   readdirSync(src).forEach(file => {
+    if (file === '.store') return
     const srcPath = join(src, file)
     const dstPath = join(dst, file)
     if (statSync(srcPath).isDirectory()) {
-      copyDirRecursive(srcPath, dstPath)
+      linkDirRecursive(srcPath, dstPath)
     } else {
-      copyFileSync(srcPath, dstPath)
+      rmSync(dstPath, { force: true })
+      try {
+        linkSync(srcPath, dstPath)
+      } catch {
+        copyFileSync(srcPath, dstPath)
+      }
     }
   })
 }
@@ -47,7 +97,7 @@ export default defineConfig({
       writeBundle() {
         // Copy version directories to dist after build
         try {
-          copyDirRecursive(resolve(__dirname, 'version'), resolve(__dirname, 'dist/version'))
+          linkDirRecursive(resolve(__dirname, 'version'), resolve(__dirname, 'dist/version'))
           console.log('✓ Version directories preserved in dist/')
         } catch (err) {
           console.error('Warning: Could not preserve version directories:', err.message)